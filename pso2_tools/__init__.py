@@ -24,11 +24,15 @@ from . import (
     classes,
     dotnet,
     export_aqp,
+    export_batch,
+    ice_cache,
     import_aqp,
     import_ice,
     import_search,
     operators,
+    previews,
     scene_props,
+    scratch,
 )
 from . import reloader as reloader
 from .panels import appearance as appearance
@@ -46,6 +50,7 @@ def register():
     bpy.types.VIEW3D_MT_edit_armature_names.append(operators.rename_bones.menu_func)
 
     scene_props.add_custom_properties()
+    import_search.register_properties()
 
 
 def unregister():
@@ -53,7 +58,11 @@ def unregister():
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
     bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
     bpy.types.VIEW3D_MT_edit_armature_names.remove(operators.rename_bones.menu_func)
+    import_search.unregister_properties()
     classes.bpy_unregister()
+    ice_cache.clear_ice_cache()
+    previews.close_previews()
+    scratch.close_scratch_spaces()
 
 
 def menu_func_import(self: bpy.types.Operator, context: bpy.types.Context):
@@ -72,6 +81,9 @@ def menu_func_export(self: bpy.types.Operator, context: bpy.types.Context):
     assert self.layout is not None
 
     self.layout.operator(export_aqp.PSO2_OT_ExportAqp.bl_idname, text="PSO2 AQP (.aqp)")
+    self.layout.operator(
+        export_batch.PSO2_OT_ExportAqpBatch.bl_idname, text="PSO2 AQP Batch (.aqp)"
+    )
 
 
 if ADDON_PATH.is_symlink():
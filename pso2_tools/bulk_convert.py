@@ -0,0 +1,380 @@
+"""
+Headless bulk conversion of catalogue items to .blend files.
+
+Run through scripts/bulk_convert.py:
+
+    blender -b --python scripts/bulk_convert.py -- --output out --type basewear
+
+The coordinating process selects items from the object database and shards them
+across worker Blender processes. Each worker imports its items one at a time
+into an empty scene and saves one .blend file per item. Results are collected
+into a JSON manifest so that finished items are skipped and failed items are
+retried when the command is run again. Workers write each result as soon as it
+is done, so if the coordinating process is interrupted, the next run adds the
+results of the items that finished to the manifest before starting.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import traceback
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import cast
+
+import bpy
+
+from . import import_model, objects
+
+MANIFEST_NAME = "manifest.json"
+
+_WORKER_EXPR = "import importlib; importlib.import_module({module!r}).worker_main()"
+
+
+@dataclass
+class ItemResult:
+    object_type: str
+    id: int
+    status: str
+    output: str = ""
+    seconds: float = 0
+    error: str = ""
+
+    @property
+    def key(self):
+        return item_key(objects.ObjectType(self.object_type), self.id)
+
+
+def item_key(object_type: objects.ObjectType, item_id: int):
+    return f"{object_type}:{item_id}"
+
+
+def get_output_path(output_dir: Path, object_type: objects.ObjectType, item_id: int):
+    return output_dir / f"{object_type}_{item_id}.blend"
+
+
+def main(argv: list[str] | None = None):
+    args = _get_parser().parse_args(get_script_args(argv))
+
+    output_dir = Path(args.output).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(args.manifest) if args.manifest else output_dir / MANIFEST_NAME
+
+    job_dir = _get_job_dir(output_dir)
+
+    manifest = load_manifest(manifest_path)
+    if _recover_worker_results(job_dir, manifest):
+        save_manifest(manifest_path, manifest)
+        _delete_worker_results(job_dir)
+
+    items = select_items(bpy.context, args.type, args.id)
+
+    pending = [
+        (object_type, item_id)
+        for object_type, item_id in items
+        if args.force or not _is_finished(manifest.get(item_key(object_type, item_id)))
+    ]
+
+    print(f"{len(items)} items selected, {len(items) - len(pending)} already converted")
+
+    if pending:
+        jobs = max(1, min(args.jobs, len(pending)))
+        shards = [pending[i::jobs] for i in range(jobs)]
+        results = _run_workers(shards, output_dir, high_quality=not args.normal_quality)
+        manifest.update((r.key, r) for r in results)
+        save_manifest(manifest_path, manifest)
+        _delete_worker_results(job_dir)
+
+    failed = [r for r in manifest.values() if r.status != "done"]
+    print(f"{len(manifest) - len(failed)} converted, {len(failed)} failed")
+    print(f"Manifest written to {manifest_path}")
+
+    return 1 if failed else 0
+
+
+def worker_main(argv: list[str] | None = None):
+    """Entry point for worker processes started by main()"""
+    parser = argparse.ArgumentParser(prog="bulk_convert worker")
+    parser.add_argument("job", help="Path to the job description")
+    args = parser.parse_args(get_script_args(argv))
+
+    job_path = Path(args.job)
+    job = json.loads(job_path.read_text(encoding="utf-8"))
+    output_dir = Path(job["output_dir"])
+    results_path = job_path.with_suffix(".results.jsonl")
+
+    with closing(objects.ObjectDatabase(bpy.context)) as db:
+        items = [
+            (
+                objects.ObjectType(object_type),
+                item_id,
+                _get_object(db, object_type, item_id),
+            )
+            for object_type, item_id in job["items"]
+        ]
+
+    with results_path.open("a", encoding="utf-8") as f:
+        for object_type, item_id, obj in items:
+            result = convert_item(
+                object_type, item_id, obj, output_dir, job["high_quality"]
+            )
+            print(f"{result.key}: {result.status} ({result.seconds:0.1f}s)")
+
+            f.write(json.dumps(asdict(result)) + "\n")
+            f.flush()
+
+
+def convert_item(
+    object_type: objects.ObjectType,
+    item_id: int,
+    obj: objects.CmxObjectBase | None,
+    output_dir: Path,
+    high_quality=True,
+):
+    """Import one catalogue item into an empty scene and save it as a .blend file"""
+    result = ItemResult(object_type=str(object_type), id=item_id, status="failed")
+    path = get_output_path(output_dir, object_type, item_id)
+
+    if obj is None:
+        result.error = "Item not found in database"
+        return result
+
+    start = time.perf_counter()
+
+    try:
+        bpy.ops.wm.read_homefile(use_empty=True)
+
+        import_result = import_model.import_object(
+            cast("bpy.types.Operator", ConsoleReporter()),
+            bpy.context,
+            obj,
+            high_quality=high_quality,
+        )
+
+        if "FINISHED" not in import_result:
+            result.error = f"Import returned {sorted(import_result)}"
+        else:
+            bpy.ops.wm.save_as_mainfile(filepath=str(path), check_existing=False)
+            result.status = "done"
+            result.output = str(path)
+
+    except Exception:
+        result.error = traceback.format_exc()
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def select_items(
+    context: bpy.types.Context,
+    object_types: list[str] | None = None,
+    item_ids: list[int] | None = None,
+) -> list[tuple[objects.ObjectType, int]]:
+    query = objects.ObjectQuery(
+        object_types=[objects.ObjectType(t) for t in object_types or []],
+        ids=item_ids,
+        limit=1000,
+    )
+    result: list[tuple[objects.ObjectType, int]] = []
+    cursor = None
+
+    with closing(objects.ObjectDatabase(context)) as db:
+        while True:
+            page = db.query(query, cursor)
+            result.extend((obj.object_type, obj.id) for obj in page.objects)
+
+            if (cursor := page.cursor) is None:
+                return result
+
+
+def load_manifest(path: Path) -> dict[str, ItemResult]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+    results = (ItemResult(**item) for item in data.get("items", []))
+    return {r.key: r for r in results}
+
+
+def save_manifest(path: Path, manifest: dict[str, ItemResult]):
+    items = sorted(manifest.values(), key=lambda r: (r.object_type, r.id))
+    data = {
+        "done": sum(1 for r in items if r.status == "done"),
+        "failed": sum(1 for r in items if r.status != "done"),
+        "items": [asdict(r) for r in items],
+    }
+
+    tempfile = path.with_suffix(".tmp")
+    tempfile.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    tempfile.replace(path)
+
+
+class ConsoleReporter:
+    """
+    Stand-in for the operator argument of the import functions when running
+    outside of an operator. Reports are printed to the console.
+    """
+
+    def report(self, level: set[str], message: str):
+        print(f"{', '.join(sorted(level))}: {message}")
+
+
+def _run_workers(
+    shards: list[list[tuple[objects.ObjectType, int]]],
+    output_dir: Path,
+    high_quality: bool,
+) -> list[ItemResult]:
+    job_dir = _get_job_dir(output_dir)
+    job_dir.mkdir(exist_ok=True)
+
+    workers: list[
+        tuple[Path, list[tuple[objects.ObjectType, int]], subprocess.Popen]
+    ] = []
+
+    for index, shard in enumerate(shards):
+        job_path = job_dir / f"worker_{index}.json"
+        job_path.write_text(
+            json.dumps(
+                {
+                    "output_dir": str(output_dir),
+                    "high_quality": high_quality,
+                    "items": [[str(t), i] for t, i in shard],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        cmd = [
+            bpy.app.binary_path,
+            "--background",
+            "--python-expr",
+            _WORKER_EXPR.format(module=__name__),
+            "--",
+            str(job_path),
+        ]
+        print(f"Starting worker {index} with {len(shard)} items")
+        workers.append((job_path, shard, subprocess.Popen(cmd)))
+
+    results: list[ItemResult] = []
+
+    for job_path, shard, process in workers:
+        returncode = process.wait()
+        finished = _read_worker_results(job_path.with_suffix(".results.jsonl"))
+        results.extend(finished.values())
+
+        # Anything the worker didn't get to was lost to a crash.
+        for object_type, item_id in shard:
+            if item_key(object_type, item_id) not in finished:
+                results.append(
+                    ItemResult(
+                        object_type=str(object_type),
+                        id=item_id,
+                        status="failed",
+                        error=f"Worker exited with code {returncode}",
+                    )
+                )
+
+    return results
+
+
+def _get_job_dir(output_dir: Path):
+    return output_dir / ".jobs"
+
+
+def _recover_worker_results(job_dir: Path, manifest: dict[str, ItemResult]):
+    """
+    Add the results left by workers of a run that was interrupted before it
+    could save the manifest, then delete them. Returns whether any were added.
+    """
+    recovered = False
+
+    for path in sorted(job_dir.glob("*.results.jsonl")):
+        results = _read_worker_results(path)
+        manifest.update(results)
+        recovered |= bool(results)
+
+    if recovered:
+        print(f"Recovered results from an interrupted run in {job_dir}")
+
+    return recovered
+
+
+def _delete_worker_results(job_dir: Path):
+    for path in job_dir.glob("*.results.jsonl"):
+        path.unlink(missing_ok=True)
+
+
+def _read_worker_results(path: Path) -> dict[str, ItemResult]:
+    try:
+        with path.open(encoding="utf-8") as f:
+            results = (ItemResult(**json.loads(line)) for line in f if line.strip())
+            return {r.key: r for r in results}
+    except FileNotFoundError:
+        return {}
+
+
+def _get_object(db: objects.ObjectDatabase, object_type: str, item_id: int):
+    return db.get_object(objects.ObjectType(object_type), item_id)
+
+
+def _is_finished(result: ItemResult | None):
+    return (
+        result is not None and result.status == "done" and Path(result.output).exists()
+    )
+
+
+def get_script_args(argv: list[str] | None):
+    if argv is not None:
+        return argv
+
+    # Blender passes everything after "--" through to the script.
+    try:
+        return sys.argv[sys.argv.index("--") + 1 :]
+    except ValueError:
+        return []
+
+
+def _get_parser():
+    parser = argparse.ArgumentParser(
+        prog="bulk_convert",
+        description="Convert PSO2 catalogue items to .blend files",
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="Directory to write .blend files to"
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        action="append",
+        choices=[str(t) for t in objects.ObjectType],
+        help="Only convert items of this type (may be repeated)",
+    )
+    parser.add_argument(
+        "-i",
+        "--id",
+        action="append",
+        type=int,
+        help="Only convert items with this ID (may be repeated)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of Blender worker processes"
+    )
+    parser.add_argument(
+        "--manifest",
+        help=f"Path to the manifest file (default: <output>/{MANIFEST_NAME})",
+    )
+    parser.add_argument(
+        "--normal-quality",
+        action="store_true",
+        help="Import normal quality models instead of high quality",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert items even if the manifest says they are already done",
+    )
+    return parser
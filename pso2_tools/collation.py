@@ -0,0 +1,47 @@
+"""
+Text normalization for sorting and searching item names.
+"""
+
+import re
+import unicodedata
+
+# Katakana which have a hiragana equivalent, mapped to that hiragana
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+_NUMBER_WIDTH = 10
+
+
+def fold_kana(text: str):
+    """Replace katakana with the equivalent hiragana"""
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def sort_key(text: str):
+    """
+    Get a key for sorting names in the order a person would expect: full and
+    half-width characters, hiragana and katakana, and upper and lower case all
+    sort together, and numbers sort by value, so "Item 2" comes before "Item 10".
+    """
+    text = fold_kana(unicodedata.normalize("NFKC", text)).casefold()
+    return re.sub(r"\d+", lambda m: m[0].zfill(_NUMBER_WIDTH), text)
+
+
+def search_key(text: str):
+    """
+    Get a key for searching names. Like sort_key(), this ignores width, kana and
+    case differences, and it also removes punctuation, symbols and spaces, so
+    "tenzan body" matches "Tenzan-Body [Ba]".
+    """
+    text = fold_kana(unicodedata.normalize("NFKC", text)).casefold()
+    return "".join(c for c in text if unicodedata.category(c)[0] not in "PSZC")
+
+
+def search_pattern(text: str):
+    """
+    Normalize a wildcard pattern the same way as search_key(), keeping its
+    * and ? wildcards.
+    """
+    return "".join(
+        part if part in ("*", "?") else search_key(part)
+        for part in re.split(r"([*?])", text)
+    )
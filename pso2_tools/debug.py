@@ -1,8 +1,18 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext, suppress
+from pathlib import Path
 from pprint import pprint
+from typing import Any
 
 import bpy
 
 from . import preferences
+from .paths import get_data_path
 
 
 def debug_print(*args, **kwargs):
@@ -13,3 +23,189 @@ def debug_print(*args, **kwargs):
 def debug_pprint(*args, **kwargs):
     if preferences.get_preferences(bpy.context).debug:
         pprint(*args, **kwargs)
+
+
+class Trace:
+    """
+    Collects timing spans in Chrome trace event format, which can be viewed
+    with chrome://tracing or https://ui.perfetto.dev
+    """
+
+    def __init__(self, name: str, record_memory=False):
+        self.name = name
+        self.events: list[dict[str, Any]] = []
+
+        self.record_memory = record_memory
+        """If set, each span's args include memory usage at its start and end"""
+
+        self._start = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def span(self, name: str, category: str, args: dict[str, Any]):
+        record_memory = self.record_memory
+        if record_memory:
+            args = {**args, **_prefix_keys(get_memory_usage(), "start_")}
+
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+
+            if record_memory:
+                args.update(_prefix_keys(get_memory_usage(), "end_"))
+
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._start) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": self._pid,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def write(self):
+        path = (
+            get_data_path()
+            / "traces"
+            / f"{time.strftime('%Y%m%d-%H%M%S')}_{self.name}.json"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+        return path
+
+
+_trace: Trace | None = None
+_NULL_SPAN = nullcontext()
+
+
+def trace_span(name: str, category="pso2", **args):
+    """
+    Context manager which records the time spent inside it to the active trace.
+    Does nothing if no trace is active.
+    """
+    if _trace is None:
+        return _NULL_SPAN
+
+    return _trace.span(name, category, args)
+
+
+@contextmanager
+def trace_operator(context: bpy.types.Context | None, name: str):
+    """
+    Records all trace spans inside this context to a trace file if tracing is
+    enabled in the add-on preferences.
+    """
+    if _trace is not None or not preferences.get_preferences(context).trace:
+        yield
+        return
+
+    trace = None
+    try:
+        with capture_trace(name) as trace:
+            yield
+    finally:
+        if trace is not None:
+            path = trace.write()
+            print(f"PSO2 trace written to {path}")
+
+
+@contextmanager
+def capture_trace(name: str, record_memory=False) -> Iterator[Trace]:
+    """
+    Records all trace spans inside this context and yields the trace. If a
+    trace is already active, this yields that trace instead.
+    """
+    global _trace
+
+    if _trace is not None:
+        old_record_memory = _trace.record_memory
+        _trace.record_memory |= record_memory
+        try:
+            yield _trace
+        finally:
+            _trace.record_memory = old_record_memory
+        return
+
+    _trace = Trace(name, record_memory)
+    try:
+        with _trace.span(name, "operator", {}):
+            yield _trace
+    finally:
+        _trace = None
+
+
+def get_memory_usage():
+    """
+    Get the process's resident memory size and its peak resident memory size
+    so far, and the size of the .NET managed heap if .NET is loaded, in bytes.
+    """
+    rss, peak_rss = _get_resident_memory()
+    usage = {"rss_bytes": rss, "peak_rss_bytes": peak_rss}
+
+    with suppress(ImportError):
+        from System import GC
+
+        usage["managed_bytes"] = int(GC.GetTotalMemory(False))
+
+    return usage
+
+
+def _prefix_keys(values: dict[str, Any], prefix: str):
+    return {prefix + key: value for key, value in values.items()}
+
+
+def _get_resident_memory():
+    if sys.platform == "win32":
+        return _get_windows_working_set()
+
+    import resource
+
+    # ru_maxrss is in kilobytes, except on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+
+    try:
+        statm = Path("/proc/self/statm").read_text(encoding="ascii")
+        return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE"), peak
+    except (OSError, ValueError, IndexError):
+        return 0, peak
+
+
+def _get_windows_working_set():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+
+    windll = ctypes.windll  # type: ignore
+    if not windll.psapi.GetProcessMemoryInfo(
+        windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+    ):
+        return 0, 0
+
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
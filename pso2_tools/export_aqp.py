@@ -5,7 +5,8 @@ import bpy
 from bpy_extras.io_utils import ExportHelper, axis_conversion, orientation_helper
 from mathutils import Matrix
 
-from . import classes, export_model
+from . import classes, export_model, export_profile
+from .debug import trace_operator
 
 
 # https://github.com/nutti/fake-bpy-module/issues/376
@@ -26,6 +27,11 @@ class PSO2_OT_ExportAqp(bpy.types.Operator, ExportHelper):  # type: ignore
         items=[
             ("NGS", "NGS", "Export for PSO2 NGS"),
             ("CLASSIC", "Classic", "Export for PSO2 classic"),
+            (
+                "BOTH",
+                "NGS + Classic",
+                "Export for PSO2 NGS, and write a second file named <name>_classic.aqp for PSO2 classic",
+            ),
         ],
         default="NGS",
     )
@@ -34,6 +40,18 @@ class PSO2_OT_ExportAqp(bpy.types.Operator, ExportHelper):  # type: ignore
         description="If a .aqn file with the same name exists, overwrite it",
         default=False,
     )
+    skip_unchanged: bpy.props.BoolProperty(
+        name="Skip Unchanged",
+        description="Skip the export if the objects and settings haven't changed since "
+        "the last export to the same file. Writes a .fingerprint file next to the .aqp file",
+        default=False,
+    )
+    profile: bpy.props.BoolProperty(
+        name="Profile",
+        description="Report the time and memory used by each step of the export, "
+        "and write the report to the add-on's data folder",
+        default=False,
+    )
 
     use_selection: bpy.props.BoolProperty(
         name="Selected Objects",
@@ -310,24 +328,61 @@ class PSO2_OT_ExportAqp(bpy.types.Operator, ExportHelper):  # type: ignore
                     "filepath",
                     "version",
                     "overwrite_aqn",
+                    "skip_unchanged",
+                    "profile",
                 )
             ),
         )
         options["global_matrix"] = global_matrix
 
+        with trace_operator(context, "export_aqp"):
+            if not self.profile:
+                return self._export(context, path, options)
+
+            # Count the objects first, while the scene is in the same state the
+            # export reads.
+            counts = export_profile.get_counts(
+                context,
+                export_model.get_export_objects(context, options),
+                apply_modifiers=options.get("use_mesh_modifiers", True),
+            )
+
+            with export_profile.profile_export(path.name) as report:
+                result = self._export(context, path, options, concurrent=False)
+
+            report.counts = counts
+            report_path = report.write()
+
+            self.report({"INFO"}, report.get_summary())
+            self.report({"INFO"}, f"Export profile written to {report_path}")
+
+            return result
+
+    def _export(
+        self,
+        context: bpy.types.Context,
+        path: Path,
+        options: "export_model.ExportOptions",
+        concurrent=True,
+    ):
         return export_model.export(
             self,
             context,
             path,
-            is_ngs=self.game_version == "NGS",
+            is_ngs=self.game_version != "CLASSIC",
             overwrite_aqn=self.overwrite_aqn,
             options=options,
+            also_classic=self.game_version == "BOTH",
+            skip_unchanged=self.skip_unchanged,
+            concurrent=concurrent,
         )
 
 
 def export_panel_main(layout: bpy.types.UILayout, operator):
     layout.prop(operator, "overwrite_aqn")
+    layout.prop(operator, "skip_unchanged")
     layout.prop(operator, "game_version")
+    layout.prop(operator, "profile")
 
 
 def export_panel_include(layout: bpy.types.UILayout, operator, is_file_browser: bool):
@@ -0,0 +1,349 @@
+"""
+Export many collections or objects to separate AQP files at once.
+
+Each item is written to an intermediate FBX file on the main thread, since that
+needs bpy. The FBX files are then converted and written on worker threads, so
+one item's conversion runs while Blender writes the next item's FBX. The
+converter can only run one conversion at a time, so there are two workers: one
+converting and one writing the previous item's files.
+A JSON summary with the time taken for each file is written to the output
+folder.
+"""
+
+import json
+import time
+import traceback
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import bpy
+from bpy_extras.io_utils import axis_conversion
+
+from . import classes, export_fingerprint, export_model, scratch
+from .debug import trace_operator, trace_span
+from .util import OperatorResult
+
+SUMMARY_NAME = "export_summary.json"
+
+_WORKERS = 2
+
+
+@dataclass
+class BatchItem:
+    name: str
+    collection: str = ""
+    """Export the objects in this collection"""
+    root: str = ""
+    """Export this object and its children"""
+
+
+@dataclass
+class BatchResult:
+    name: str
+    path: str
+    status: str
+    fbx_seconds: float = 0
+    convert_seconds: float = 0
+    error: str = ""
+
+
+def get_collection_items(context: bpy.types.Context):
+    """Get one item for each top-level collection in the scene with meshes"""
+    assert context.scene is not None
+
+    return [
+        BatchItem(name=collection.name, collection=collection.name)
+        for collection in context.scene.collection.children
+        if any(obj.type == "MESH" for obj in collection.all_objects)
+    ]
+
+
+def get_selected_root_items(context: bpy.types.Context):
+    """Get one item for each selected object whose parent is not selected"""
+    selected = set(context.selected_objects or [])
+
+    return [
+        BatchItem(name=obj.name, root=obj.name)
+        for obj in selected
+        if obj.parent not in selected
+    ]
+
+
+def export_batch(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    items: list[BatchItem],
+    directory: Path,
+    is_ngs=True,
+    overwrite_aqn=False,
+    options: export_model.ExportOptions | None = None,
+    skip_unchanged=False,
+):
+    """
+    Export each item to "<name>.aqp" in a directory. If skip_unchanged is set,
+    items which haven't changed since they were last exported are skipped.
+    """
+    options = options or {}
+    results: list[BatchResult] = []
+    pending: list[
+        tuple[BatchResult, Future[float], export_fingerprint.Fingerprint | None]
+    ] = []
+
+    # Different names can have the same clean name. File names aren't case
+    # sensitive on Windows.
+    used_names: set[str] = set()
+
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with (
+        scratch.get_scratch_space(context).directory("export_batch") as tempdir,
+        ThreadPoolExecutor(_WORKERS, thread_name_prefix="pso2_export") as pool,
+    ):
+        for i, item in enumerate(items):
+            path = directory / f"{bpy.path.clean_name(item.name)}.aqp"
+            fbxfile = tempdir / f"{i}.fbx"
+            result = BatchResult(name=item.name, path=str(path), status="failed")
+            results.append(result)
+
+            if path.name.casefold() in used_names:
+                result.error = f"Another item is also exported to {path.name}"
+                continue
+
+            used_names.add(path.name.casefold())
+
+            fingerprint = None
+            start = time.perf_counter()
+            try:
+                with (
+                    trace_span("export_item", item=item.name),
+                    _select_item(context, item),
+                ):
+                    item_options = _get_item_options(item, options)
+
+                    if skip_unchanged:
+                        fingerprint = export_model.get_fingerprint(
+                            context, item_options, [(path, is_ngs)], overwrite_aqn
+                        )
+                        if export_fingerprint.is_unchanged(
+                            fingerprint, path, export_model.get_output_paths([path])
+                        ):
+                            result.status = "unchanged"
+                            continue
+
+                    status = export_model.write_fbx(
+                        operator, context, fbxfile, item_options
+                    )
+            except Exception:
+                result.error = traceback.format_exc()
+                continue
+            finally:
+                result.fbx_seconds = time.perf_counter() - start
+
+            if "FINISHED" not in status:
+                result.error = f"FBX export returned {status}"
+                continue
+
+            future = pool.submit(
+                _convert_item,
+                fbxfile,
+                path,
+                is_ngs,
+                overwrite_aqn,
+                options.get("rigid", False),
+            )
+            pending.append((result, future, fingerprint))
+
+        for result, future, fingerprint in pending:
+            try:
+                result.convert_seconds = future.result()
+                result.status = "done"
+            except Exception:
+                result.error = traceback.format_exc()
+                continue
+
+            if fingerprint:
+                path = Path(result.path)
+                export_fingerprint.save_fingerprint(
+                    fingerprint, path, export_model.get_output_paths([path])
+                )
+
+    write_summary(directory / SUMMARY_NAME, results)
+
+    return results
+
+
+def write_summary(path: Path, results: list[BatchResult]):
+    data = {
+        "files": [asdict(r) for r in results],
+        "seconds": sum(r.fbx_seconds + r.convert_seconds for r in results),
+    }
+
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def _convert_item(
+    fbxfile: Path, path: Path, is_ngs: bool, overwrite_aqn: bool, rigid: bool
+):
+    start = time.perf_counter()
+    try:
+        export_model.convert_and_write(fbxfile, path, is_ngs, rigid, overwrite_aqn)
+    finally:
+        # Only keep one item's FBX file around per worker.
+        fbxfile.unlink(missing_ok=True)
+
+    return time.perf_counter() - start
+
+
+def _get_item_options(item: BatchItem, options: export_model.ExportOptions):
+    item_options = export_model.ExportOptions(**options)
+
+    if item.collection:
+        item_options["collection"] = item.collection
+
+    if item.root:
+        item_options["use_selection"] = True
+
+    return item_options
+
+
+@contextmanager
+def _select_item(context: bpy.types.Context, item: BatchItem) -> Iterator[None]:
+    if item.root:
+        root = bpy.data.objects[item.root]
+        selection = [root, *root.children_recursive]
+
+        with context.temp_override(selected_objects=selection):  # type: ignore
+            yield
+    else:
+        yield
+
+
+@classes.register
+class PSO2_OT_ExportAqpBatch(bpy.types.Operator):
+    """Write each collection or selected object to a separate PSO2 AQP file"""
+
+    bl_label = "Export AQP Batch"
+    bl_idname = "pso2.export_aqp_batch"
+    bl_options = {"UNDO", "PRESET"}
+
+    directory: bpy.props.StringProperty(subtype="DIR_PATH")
+    filter_folder: bpy.props.BoolProperty(default=True, options={"HIDDEN"})
+
+    source: bpy.props.EnumProperty(
+        name="Export",
+        items=[
+            (
+                "COLLECTIONS",
+                "Collections",
+                "Export each top-level collection to a separate file",
+            ),
+            (
+                "SELECTED",
+                "Selected Objects",
+                "Export each selected object and its children to a separate file",
+            ),
+        ],
+        default="COLLECTIONS",
+    )
+    game_version: bpy.props.EnumProperty(
+        name="Game Version",
+        items=[
+            ("NGS", "NGS", "Export for PSO2 NGS"),
+            ("CLASSIC", "Classic", "Export for PSO2 classic"),
+        ],
+        default="NGS",
+    )
+    overwrite_aqn: bpy.props.BoolProperty(
+        name="Overwrite .aqn",
+        description="If a .aqn file with the same name exists, overwrite it",
+        default=False,
+    )
+    use_mesh_modifiers: bpy.props.BoolProperty(
+        name="Apply Modifiers",
+        description="Apply modifiers to mesh objects (except Armature ones)",
+        default=True,
+    )
+    rigid: bpy.props.BoolProperty(
+        name="Rigid", description="Export as a rigid model", default=False
+    )
+    skip_unchanged: bpy.props.BoolProperty(
+        name="Skip Unchanged",
+        description="Skip files whose objects and settings haven't changed since "
+        "they were last exported. Writes a .fingerprint file next to each .aqp file",
+        default=False,
+    )
+
+    def draw(self, context):
+        assert self.layout is not None
+
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        layout.prop(self, "source")
+        layout.prop(self, "game_version")
+        layout.prop(self, "overwrite_aqn")
+        layout.prop(self, "use_mesh_modifiers")
+        layout.prop(self, "rigid")
+        layout.prop(self, "skip_unchanged")
+
+    def execute(self, context) -> OperatorResult:
+        if not self.directory:  # type: ignore
+            raise ValueError("directory not set")
+
+        directory = Path(self.directory)  # type: ignore
+
+        if self.source == "SELECTED":
+            items = get_selected_root_items(context)
+        else:
+            items = get_collection_items(context)
+
+        if not items:
+            self.report({"ERROR"}, "Nothing to export")
+            return {"CANCELLED"}
+
+        options = export_model.ExportOptions(
+            global_matrix=axis_conversion(to_forward="-Z", to_up="Y").to_4x4(),
+            use_mesh_modifiers=self.use_mesh_modifiers,
+            use_triangles=True,
+            bake_anim=False,
+            rigid=self.rigid,
+        )
+
+        start = time.perf_counter()
+        with trace_operator(context, "export_aqp_batch"):
+            results = export_batch(
+                self,
+                context,
+                items,
+                directory,
+                is_ngs=self.game_version == "NGS",
+                overwrite_aqn=self.overwrite_aqn,
+                options=options,
+                skip_unchanged=self.skip_unchanged,
+            )
+        elapsed = time.perf_counter() - start
+
+        failed = [r for r in results if r.status not in ("done", "unchanged")]
+        unchanged = [r for r in results if r.status == "unchanged"]
+        for result in failed:
+            self.report({"WARNING"}, f"Failed to export {result.name}")
+
+        exported = len(results) - len(failed) - len(unchanged)
+        self.report(
+            {"INFO"},
+            f"Exported {exported} of {len(results)} files ({len(unchanged)} unchanged) "
+            f"in {elapsed:0.1f}s. See {SUMMARY_NAME} for details.",
+        )
+
+        return {"FINISHED"} if len(failed) < len(results) else {"CANCELLED"}
+
+    def invoke(self, context, event):  # type: ignore https://github.com/nutti/fake-bpy-module/issues/376
+        assert context.window_manager is not None
+
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
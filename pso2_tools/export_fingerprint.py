@@ -0,0 +1,313 @@
+"""
+Change detection for AQP exports.
+
+A fingerprint is a hash of everything that affects an exported file: the
+evaluated mesh data, materials and modifiers of each exported object, the rest
+and pose transforms of their armatures, the scene's unit settings, the export
+settings, and the versions of the add-on and the model converter. It is saved in
+a sidecar file next to the .aqp file, along with the size and modified time of
+each output file. If the fingerprint and the outputs are unchanged the next
+time the same file is exported, the export is skipped.
+
+An .aqp file is converted as a whole, so a change to any object in it converts
+the whole file again. The fingerprint also records a hash per object, so debug
+logging can show which objects changed.
+"""
+
+import hashlib
+import json
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import bpy
+from mathutils import Matrix
+
+from .debug import debug_print, trace_span
+from .paths import get_addon_version, get_converter_version
+
+SIDECAR_SUFFIX = ".fingerprint"
+
+# Increment this to export everything again when the fingerprint changes.
+_FINGERPRINT_VERSION = 2
+
+
+@dataclass
+class Fingerprint:
+    digest: str
+    objects: dict[str, str] = field(default_factory=dict)
+
+
+def get_sidecar_path(path: Path):
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def get_fingerprint(
+    context: bpy.types.Context,
+    objects: Iterable[bpy.types.Object],
+    settings: dict[str, Any],
+):
+    """Get the fingerprint for exporting objects with some export settings"""
+    with trace_span("get_fingerprint"):
+        depsgraph = context.evaluated_depsgraph_get()
+
+        object_digests = {
+            obj.name: _hash_object(obj, depsgraph).hexdigest()
+            for obj in sorted(_with_armatures(objects), key=lambda o: o.name)
+        }
+
+        digest = hashlib.blake2b()
+        _hash_value(
+            digest,
+            [
+                _FINGERPRINT_VERSION,
+                get_addon_version(),
+                get_converter_version(),
+                _get_unit_settings(context.scene),
+                settings,
+                object_digests,
+            ],
+        )
+
+        return Fingerprint(digest.hexdigest(), object_digests)
+
+
+def is_unchanged(fingerprint: Fingerprint, path: Path, outputs: list[Path]):
+    """
+    Check whether the last export to path had the same fingerprint, and none of
+    the files it wrote have changed since.
+    """
+    try:
+        saved = json.loads(get_sidecar_path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+
+    if saved.get("outputs") != _get_output_stats(outputs):
+        return False
+
+    if saved.get("fingerprint") == fingerprint.digest:
+        return True
+
+    saved_objects: dict[str, str] = saved.get("objects", {})
+    changed = [
+        name
+        for name, digest in fingerprint.objects.items()
+        if saved_objects.get(name) != digest
+    ]
+    removed = saved_objects.keys() - fingerprint.objects.keys()
+    debug_print(f"Export changed: {changed}, removed: {sorted(removed)}")
+
+    return False
+
+
+def save_fingerprint(fingerprint: Fingerprint, path: Path, outputs: list[Path]):
+    data = {
+        "fingerprint": fingerprint.digest,
+        "objects": fingerprint.objects,
+        "outputs": _get_output_stats(outputs),
+    }
+
+    get_sidecar_path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _get_output_stats(outputs: list[Path]):
+    stats = {}
+    for output in outputs:
+        try:
+            stat = output.stat()
+            stats[output.name] = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            stats[output.name] = None
+
+    return stats
+
+
+def _with_armatures(objects: Iterable[bpy.types.Object]):
+    """Add the armatures which deform any of the objects"""
+    result = set(objects)
+
+    for obj in list(result):
+        parent = obj.parent
+        while parent:
+            result.add(parent)
+            parent = parent.parent
+
+        for mod in obj.modifiers:
+            if isinstance(mod, bpy.types.ArmatureModifier) and mod.object:
+                result.add(mod.object)
+
+    return result
+
+
+def _hash_object(obj: bpy.types.Object, depsgraph: bpy.types.Depsgraph):
+    digest = hashlib.blake2b()
+
+    _hash_value(
+        digest,
+        [
+            obj.name,
+            obj.type,
+            obj.parent.name if obj.parent else None,
+            obj.parent_type,
+            obj.parent_bone,
+            obj.matrix_world,
+            _get_custom_props(obj),
+            [
+                [mod.name, mod.type, mod.show_viewport, mod.show_render]
+                for mod in obj.modifiers
+            ],
+        ],
+    )
+
+    if obj.type == "MESH":
+        _hash_mesh(digest, obj, depsgraph)
+        _hash_materials(digest, obj)
+    elif obj.type == "ARMATURE":
+        _hash_armature(digest, obj)
+
+    return digest
+
+
+def _hash_mesh(digest, obj: bpy.types.Object, depsgraph: bpy.types.Depsgraph):
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        _hash_collection(digest, mesh.vertices, "co", "f", 3)
+        _hash_collection(digest, mesh.loops, "vertex_index", "i")
+        _hash_collection(digest, mesh.corner_normals, "vector", "f", 3)
+        _hash_collection(digest, mesh.polygons, "loop_start", "i")
+        _hash_collection(digest, mesh.polygons, "material_index", "i")
+
+        for layer in mesh.uv_layers:
+            _hash_value(digest, layer.name)
+            _hash_collection(digest, layer.uv, "vector", "f", 2)
+
+        for attr in mesh.color_attributes:
+            _hash_value(digest, [attr.name, attr.domain, attr.data_type])
+            _hash_collection(digest, attr.data, "color", "f", 4)
+
+        _hash_value(digest, [group.name for group in obj.vertex_groups])
+
+        # There is no bulk accessor for vertex group weights.
+        weights = array("f")
+        for vertex in mesh.vertices:
+            for g in vertex.groups:
+                weights.extend((vertex.index, g.group, g.weight))
+
+        digest.update(weights)
+    finally:
+        obj_eval.to_mesh_clear()
+
+
+def _hash_materials(digest, obj: bpy.types.Object):
+    for slot in obj.material_slots:
+        material = slot.material
+        if material is None:
+            _hash_value(digest, None)
+            continue
+
+        _hash_value(digest, [material.name, _get_custom_props(material)])
+
+        if material.node_tree:
+            for node in material.node_tree.nodes:
+                image = getattr(node, "image", None)
+                _hash_value(
+                    digest,
+                    [
+                        node.name,
+                        node.bl_idname,
+                        image.filepath if image else None,
+                        [
+                            _get_socket_value(socket)
+                            for socket in node.inputs
+                            if not socket.is_linked
+                        ],
+                    ],
+                )
+
+            _hash_value(
+                digest,
+                [
+                    [
+                        link.from_node.name,
+                        link.from_socket.identifier,
+                        link.to_node.name,
+                        link.to_socket.identifier,
+                        link.is_muted,
+                    ]
+                    for link in material.node_tree.links
+                ],
+            )
+
+
+def _hash_armature(digest, obj: bpy.types.Object):
+    armature = obj.data
+    assert isinstance(armature, bpy.types.Armature)
+
+    for bone in armature.bones:
+        _hash_value(
+            digest,
+            [
+                bone.name,
+                bone.parent.name if bone.parent else None,
+                bone.matrix_local,
+                _get_custom_props(bone),
+            ],
+        )
+
+    if obj.pose:
+        for pose_bone in obj.pose.bones:
+            _hash_value(digest, [pose_bone.name, pose_bone.matrix_basis])
+
+
+def _get_unit_settings(scene: bpy.types.Scene | None):
+    # The converter scales the model by the FBX file's unit scale.
+    if scene is None:
+        return None
+
+    units = scene.unit_settings
+    return [units.system, units.scale_length, units.length_unit]
+
+
+def _hash_collection(digest, collection, attr: str, typecode: str, size=1):
+    data = array(typecode, [0]) * (len(collection) * size)
+    collection.foreach_get(attr, data)
+
+    _hash_value(digest, [attr, len(collection)])
+    digest.update(data)
+
+
+def _hash_value(digest, value):
+    digest.update(json.dumps(value, sort_keys=True, default=_to_json).encode())
+    digest.update(b"\0")
+
+
+def _get_custom_props(item: bpy.types.ID | bpy.types.Bone | bpy.types.Object):
+    return {key: item[key] for key in item.keys()}  # noqa: SIM118
+
+
+def _get_socket_value(socket: bpy.types.NodeSocket):
+    return getattr(socket, "default_value", None)
+
+
+def _to_json(value):
+    # Custom properties can point to other data blocks. Their str() includes a
+    # memory address, which changes every session.
+    if isinstance(value, bpy.types.ID):
+        return [value.id_type, value.name_full]
+
+    if isinstance(value, Matrix):
+        return [list(row) for row in value]
+
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+
+    if hasattr(value, "to_list"):
+        return value.to_list()
+
+    try:
+        return list(value)
+    except TypeError:
+        return str(value)
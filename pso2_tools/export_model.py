@@ -1,15 +1,21 @@
-from collections.abc import Iterable
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any, TypedDict, cast, get_type_hints
+from typing import TYPE_CHECKING, Any, TypedDict, cast, get_type_hints
 
 import bpy
 from mathutils import Matrix
 
-from . import dotnet, fbx_wrapper
+from . import dotnet, export_fingerprint, fbx_wrapper, scratch
+from .debug import trace_span
 from .util import OperatorResult
 
+if TYPE_CHECKING:
+    from AquaModelLibrary.Data.PSO2.Aqua import AquaNode, AquaObject
+
 
 class FbxExportOptions(TypedDict, total=False):
     use_selection: bool
@@ -64,100 +70,321 @@ def export(
     is_ngs=True,
     overwrite_aqn=False,
     options: ExportOptions | None = None,
+    also_classic=False,
+    skip_unchanged=False,
+    concurrent=True,
 ) -> OperatorResult:
-    from AquaModelLibrary.Core.General import AssimpModelImporter
-    from AquaModelLibrary.Data.PSO2.Aqua import AquaNode, AquaObject, AquaPackage
+    """
+    Export to an .aqp file. If also_classic is set, a second model for PSO2
+    classic is converted from the same intermediate FBX file and written to
+    get_classic_path(path). If skip_unchanged is set, nothing is exported if
+    the objects and settings are the same as the last export to path. If
+    concurrent is unset, the models are converted and written one after the
+    other, e.g. so their memory use can be measured separately.
+    """
+    options = options or {}
 
-    dotnet.set_assimp_probing_paths()
+    targets = [(path, is_ngs)]
+    if also_classic:
+        targets.append((get_classic_path(path), False))
 
-    options = options or {}
+    outputs = get_output_paths(p for p, _ in targets)
 
-    with TemporaryDirectory() as tempdir:
-        fbxfile = Path(tempdir) / path.with_suffix(".fbx").name
+    fingerprint = None
+    if skip_unchanged:
+        fingerprint = get_fingerprint(context, options, targets, overwrite_aqn)
 
-        # Make sure the armature is included for everything that will be exported,
-        # or the exported FBX will convert to a broken AQP.
-        with _include_parents(context, options):
-            fbx_options = _get_fbx_options(options)
+        if export_fingerprint.is_unchanged(fingerprint, path, outputs):
+            operator.report({"INFO"}, f"{path.name} is unchanged. Skipped export.")
+            return {"FINISHED"}
 
-            result = fbx_wrapper.save(
-                operator, context, filepath=str(fbxfile), **fbx_options
-            )
+    with scratch.get_scratch_space(context).directory("export") as tempdir:
+        fbxfile = tempdir / path.with_suffix(".fbx").name
 
+        result = write_fbx(operator, context, fbxfile, options)
         if "FINISHED" not in result:
             return result
 
+        # Conversions run one at a time (see ExporterSession), but one target's
+        # files can be written while the other target is converted.
+        workers = len(targets) if concurrent else 1
+        with ThreadPoolExecutor(workers, thread_name_prefix="pso2_export") as pool:
+            futures = [
+                pool.submit(
+                    convert_and_write,
+                    fbxfile,
+                    target_path,
+                    target_is_ngs,
+                    rigid=options.get("rigid", False),
+                    overwrite_aqn=overwrite_aqn,
+                )
+                for target_path, target_is_ngs in targets
+            ]
+
+            for future in futures:
+                future.result()
+
+    if fingerprint:
+        export_fingerprint.save_fingerprint(fingerprint, path, outputs)
+
+    return {"FINISHED"}
+
+
+def get_classic_path(path: Path):
+    """Get the path for the classic model of a dual-target export"""
+    return path.with_stem(f"{path.stem}_classic")
+
+
+def get_output_paths(paths: Iterable[Path]):
+    """Get the .aqp and .aqn files written by exporting to some paths"""
+    return [output for path in paths for output in (path, path.with_suffix(".aqn"))]
+
+
+def get_export_objects(context: bpy.types.Context, options: ExportOptions):
+    """
+    Get the meshes and armatures included by the FBX export options, the same
+    way the FBX exporter chooses them, plus the parents of the meshes, which
+    are always exported.
+    """
+    objects = _get_source_objects(context, options)
+
+    if options.get("use_visible"):
+        objects = [obj for obj in objects if obj.visible_get()]
+
+    result = [obj for obj in objects if obj.type in {"MESH", "ARMATURE"}]
+    ancestors = _get_ancestors(obj for obj in result if obj.type == "MESH")
+
+    return [*result, *(ancestors - set(result))]
+
+
+def get_fingerprint(
+    context: bpy.types.Context,
+    options: ExportOptions,
+    targets: list[tuple[Path, bool]],
+    overwrite_aqn=False,
+):
+    """Get the change detection fingerprint for an export"""
+    return export_fingerprint.get_fingerprint(
+        context,
+        get_export_objects(context, options),
+        {
+            "options": options,
+            "targets": [[path.name, is_ngs] for path, is_ngs in targets],
+            "overwrite_aqn": overwrite_aqn,
+        },
+    )
+
+
+def write_fbx(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    fbxfile: Path,
+    options: ExportOptions,
+) -> OperatorResult:
+    """Write the objects to export to an intermediate FBX file"""
+    # Make sure the armature is included for everything that will be exported,
+    # or the exported FBX will convert to a broken AQP.
+    with _include_parents(context, options) as options:
+        fbx_options = _get_fbx_options(options)
+
+        with trace_span("fbx_wrapper.save"):
+            return fbx_wrapper.save(
+                operator, context, filepath=str(fbxfile), **fbx_options
+            )
+
+
+def convert_fbx(fbxfile: Path, is_ngs=True, rigid=False):
+    """
+    Convert an intermediate FBX file to a model and skeleton. This does not use
+    bpy, so it may be run from worker threads.
+    """
+    return get_exporter_session().convert_file(fbxfile, is_ngs, rigid)
+
+
+class ExporterSession:
+    """
+    Converts FBX files to AQP models. The converter's global settings are set up
+    once when the session is created and reused by every conversion, so tools
+    which export many files can call convert() in a loop.
+
+    The setup this saves is small: the Assimp probing paths were already only
+    set once per process, so a session only saves setting scaleHandling for
+    each file. Almost all of an export's time is spent converting and writing.
+    """
+
+    def __init__(self):
+        from AquaModelLibrary.Core.General import AssimpModelImporter
+
+        dotnet.set_assimp_probing_paths()
+
         AssimpModelImporter.scaleHandling = (
             AssimpModelImporter.ScaleHandling.FileScaling
         )
 
+        # AssimpModelImporter keeps its state in static fields, so it isn't
+        # safe to run more than one conversion at a time.
+        self._convert_lock = threading.Lock()
+
+    def convert_file(self, fbxfile: Path, is_ngs=True, rigid=False):
+        """
+        Convert an FBX file to a model and skeleton. This does not use bpy, so
+        it may be run from worker threads, but conversions on different threads
+        run one at a time.
+        """
+        from AquaModelLibrary.Core.General import AssimpModelImporter
+        from AquaModelLibrary.Data.PSO2.Aqua import AquaNode
+
         # TODO: support exporting motions
-        model, aqn = cast(
-            "tuple[AquaObject, AquaNode]",
-            AssimpModelImporter.AssimpAquaConvertFull(
-                initialFilePath=str(fbxfile),
-                scaleFactor=1,
-                preAssignNodeIds=False,
-                isNGS=is_ngs,
-                aqn=AquaNode(),
-                rigidImport=options.get("rigid", False),
-            ),
-        )
+        with self._convert_lock, trace_span("AssimpAquaConvertFull"):
+            return cast(
+                "tuple[AquaObject, AquaNode]",
+                AssimpModelImporter.AssimpAquaConvertFull(
+                    initialFilePath=str(fbxfile),
+                    scaleFactor=1,
+                    preAssignNodeIds=False,
+                    isNGS=is_ngs,
+                    aqn=AquaNode(),
+                    rigidImport=rigid,
+                ),
+            )
+
+    def convert(self, fbx: bytes | Path, tempdir: Path, is_ngs=True, rigid=False):
+        """
+        Convert an FBX file, or the contents of one, and return the contents of
+        the .aqp and .aqn files. Intermediate files are written to tempdir. Get
+        it on the main thread, e.g. from scratch.ScratchSpace.directory(), since
+        the scratch space is chosen from the add-on preferences. Conversions
+        running at once need separate folders.
+        """
+        if isinstance(fbx, bytes):
+            fbxfile = tempdir / "model.fbx"
+            fbxfile.write_bytes(fbx)
+        else:
+            fbxfile = fbx
+
+        model, aqn = self.convert_file(fbxfile, is_ngs, rigid)
+
+        aqp_path = tempdir / "model.aqp"
+        write_aqp(aqp_path, model, aqn, overwrite_aqn=True)
+
+        return aqp_path.read_bytes(), aqp_path.with_suffix(".aqn").read_bytes()
+
+
+_session: ExporterSession | None = None
+_session_lock = threading.Lock()
+
+
+def get_exporter_session():
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = ExporterSession()
+
+        return _session
+
+
+def convert_and_write(
+    fbxfile: Path, path: Path, is_ngs=True, rigid=False, overwrite_aqn=False
+):
+    """Convert an intermediate FBX file and write the result to an .aqp file"""
+    model, aqn = convert_fbx(fbxfile, is_ngs, rigid)
+    write_aqp(path, model, aqn, overwrite_aqn)
 
-    package = AquaPackage(model)
-    package.WritePackage(str(path))
+
+def write_aqp(path: Path, model: "AquaObject", aqn: "AquaNode", overwrite_aqn=False):
+    """
+    Write a converted model to an .aqp file, and its skeleton to an .aqn file
+    of the same name if there isn't one already or overwrite_aqn is set.
+
+    Each file is written to a temporary file next to it, which then replaces it,
+    so a failed export never leaves a partial file behind.
+    """
+    from AquaModelLibrary.Data.PSO2.Aqua import AquaPackage
+    from System.IO import File
+
+    with trace_span("WritePackage"), _replace_on_success(path) as tempfile:
+        package = AquaPackage(model)
+        package.WritePackage(str(tempfile))
 
     aqn_path = path.with_suffix(".aqn")
     if overwrite_aqn or not aqn_path.exists():
-        aqn_path.write_bytes(aqn.GetBytesNIFL())  # type: ignore
-
-    return {"FINISHED"}
+        with trace_span("GetBytesNIFL"), _replace_on_success(aqn_path) as tempfile:
+            # Write from .NET so the file's contents are never copied into Python.
+            File.WriteAllBytes(str(tempfile), aqn.GetBytesNIFL())
 
 
 @contextmanager
-def _include_parents(context: bpy.types.Context, fbx_options: ExportOptions):
-    shown_objects: set[bpy.types.Object] = set()
-    viewport_shown_objects: set[bpy.types.Object] = set()
+def _replace_on_success(path: Path) -> Iterator[Path]:
+    """
+    Yields a temporary path in the same folder as path. If the context exits
+    without an error, the temporary file replaces path. Otherwise it is deleted.
+    """
+    # Keep the extension in case a writer checks it. Exports to different files
+    # may run on several threads at once, so include the thread in the name.
+    tempfile = path.with_name(
+        f"{path.stem}.{os.getpid()}-{threading.get_ident()}.tmp{path.suffix}"
+    )
 
-    use_visible = fbx_options.get("use_visible", False)
-    use_selection = fbx_options.get("use_selection", False)
+    try:
+        yield tempfile
+        tempfile.replace(path)
+    finally:
+        tempfile.unlink(missing_ok=True)
 
-    if use_selection:
-        ctx_objects = context.selected_objects
-    else:
-        assert context.view_layer is not None
-        ctx_objects = context.view_layer.objects
 
-    if ctx_objects is None:
-        raise TypeError()
+@contextmanager
+def _include_parents(
+    context: bpy.types.Context, options: ExportOptions
+) -> Iterator[ExportOptions]:
+    """
+    Yields export options which include the parents of every exported mesh. The
+    FBX exporter only chooses objects from a collection or the selection, so
+    this exports the chosen objects and their parents as an overridden
+    selection instead.
+    """
+    shown_objects: list[bpy.types.Object] = []
+    viewport_shown_objects: list[bpy.types.Object] = []
+
+    ctx_objects = _get_source_objects(context, options)
+    meshes = [obj for obj in ctx_objects if obj.type == "MESH"]
+
+    use_visible = options.get("use_visible", False)
+    use_selection = options.get("use_selection", False)
+    use_collection = bool(
+        options.get("collection") or options.get("use_active_collection")
+    )
 
     try:
         # If we are only including visible objects, make sure the parents of any
         # visible objects are also visible.
         if use_visible:
-            for obj in _get_visible_meshes(ctx_objects):
-                while obj := obj.parent:
-                    if obj.hide_get():
-                        obj.hide_set(False)
-                        shown_objects.add(obj)
-
-                    if obj.hide_viewport:
-                        obj.hide_viewport = False
-                        viewport_shown_objects.add(obj)
-
-        # If we are only including selected objects, make sure the parents of any
-        # selected objects are also selected.
-        if use_selection:
-            selection = set(context.selected_objects or [])
-            for obj in _get_selected_meshes(ctx_objects):
-                while obj := obj.parent:
-                    if not obj.select_get():
-                        selection.add(obj)
+            meshes = [obj for obj in meshes if obj.visible_get()]
+
+            for obj in _get_ancestors(meshes):
+                if obj.hide_get():
+                    obj.hide_set(False)
+                    shown_objects.append(obj)
+
+                if obj.hide_viewport:
+                    obj.hide_viewport = False
+                    viewport_shown_objects.append(obj)
+
+        # If we are only including selected objects or the objects in a
+        # collection, select them and their parents. ctx_objects is already
+        # filtered by the selection, which may be overridden, so the FBX
+        # exporter must not check select_get() or the collection again.
+        if use_selection or use_collection:
+            selection = set(ctx_objects) | _get_ancestors(meshes)
+            options = ExportOptions(**options)
+            options["use_selection"] = True
+            options["use_active_collection"] = False
+            options["collection"] = ""
 
             with context.temp_override(selected_objects=list(selection)):  # type: ignore
-                yield
+                yield options
         else:
-            yield
+            yield options
     finally:
         for obj in shown_objects:
             obj.hide_set(True)
@@ -166,12 +393,46 @@ def _include_parents(context: bpy.types.Context, fbx_options: ExportOptions):
             obj.hide_viewport = True
 
 
-def _get_visible_meshes(objects: Iterable[bpy.types.Object]):
-    return (obj for obj in objects if obj.type == "MESH" and obj.visible_get())
+def _get_source_objects(context: bpy.types.Context, options: ExportOptions):
+    """
+    Get the objects chosen by the FBX export options, before filtering them by
+    visibility or type
+    """
+    assert context.view_layer is not None
+
+    if collection := options.get("collection"):
+        objects = list(bpy.data.collections[collection].all_objects)
+    elif options.get("use_active_collection"):
+        objects = list(
+            context.view_layer.active_layer_collection.collection.all_objects
+        )
+    elif options.get("use_selection"):
+        return list(context.selected_objects or [])
+    else:
+        return list(context.view_layer.objects)
+
+    if options.get("use_selection"):
+        selected = set(context.selected_objects or [])
+        objects = [obj for obj in objects if obj in selected]
+
+    return objects
+
+
+def _get_ancestors(objects: Iterable[bpy.types.Object]):
+    """
+    Get the parents, grandparents, etc. of some objects. Each chain of parents
+    is only followed until it reaches an ancestor that was already found, so
+    shared ancestors are only visited once.
+    """
+    ancestors: set[bpy.types.Object] = set()
 
+    for obj in objects:
+        parent = obj.parent
+        while parent is not None and parent not in ancestors:
+            ancestors.add(parent)
+            parent = parent.parent
 
-def _get_selected_meshes(objects: Iterable[bpy.types.Object]):
-    return (obj for obj in objects if obj.type == "MESH" and obj.select_get())
+    return ancestors
 
 
 def _get_fbx_options(options: ExportOptions):
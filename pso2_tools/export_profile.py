@@ -0,0 +1,183 @@
+"""
+Profiling reports for AQP exports.
+
+A report lists the time spent in each phase of an export, the memory used by the
+process and by .NET around each phase, and the number of vertices, faces, bones
+and materials exported. It is written as JSON to the add-on's data folder along
+with the add-on and Blender versions, so reports from different versions can be
+compared.
+
+Phases are the spans recorded by debug.trace_span(), so they match the steps in
+timing traces. The Assimp read happens inside AssimpAquaConvertFull and can't be
+timed separately.
+
+Memory is sampled at the start and end of each phase, so a phase's transient
+peak is measured with the process's peak resident memory, which the OS tracks.
+That can only show a phase's peak if it is higher than any earlier one. Exports
+run their conversions one at a time while profiling, so the memory changes of
+NGS + Classic conversions aren't mixed together.
+"""
+
+import json
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import bpy
+
+from .debug import capture_trace
+from .paths import get_addon_version, get_data_path
+
+REPORT_DIR_NAME = "profiles"
+
+
+@dataclass
+class PhaseReport:
+    name: str
+    calls: int = 0
+    seconds: float = 0
+    rss_delta_bytes: int = 0
+    """Change in the process's resident memory"""
+    managed_delta_bytes: int = 0
+    """Change in the size of the .NET managed heap"""
+    peak_rss_bytes: int = 0
+    """
+    The process's peak resident memory at the end of the phase. This includes
+    any transient peak during the phase, unless an earlier peak was higher.
+    """
+    peak_rss_increase_bytes: int = 0
+    """How much the phase raised the process's peak resident memory"""
+
+
+@dataclass
+class ExportReport:
+    name: str
+    addon_version: str = ""
+    blender_version: str = ""
+    seconds: float = 0
+    phases: list[PhaseReport] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def write(self):
+        path = (
+            get_data_path()
+            / REPORT_DIR_NAME
+            / f"{time.strftime('%Y%m%d-%H%M%S')}_{bpy.path.clean_name(self.name)}.json"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+
+        return path
+
+    def get_summary(self):
+        phases = ", ".join(f"{p.name} {p.seconds:0.2f}s" for p in self.phases)
+        counts = ", ".join(f"{value:,} {key}" for key, value in self.counts.items())
+
+        return f"Export took {self.seconds:0.2f}s ({phases}). Exported {counts}."
+
+
+@contextmanager
+def profile_export(name: str) -> Iterator[ExportReport]:
+    """
+    Records the phases of an export inside this context. The yielded report is
+    filled in when the context exits.
+    """
+    report = ExportReport(
+        name=name,
+        addon_version=get_addon_version(),
+        blender_version=bpy.app.version_string,
+    )
+
+    start = time.perf_counter()
+    with capture_trace(name, record_memory=True) as trace:
+        first_event = len(trace.events)
+        yield report
+        events = trace.events[first_event:]
+
+    report.seconds = time.perf_counter() - start
+    report.phases = _get_phases(events)
+
+
+def get_counts(
+    context: bpy.types.Context,
+    objects: Iterable[bpy.types.Object],
+    apply_modifiers=True,
+):
+    """
+    Count the vertices, faces, bones and materials in exported objects. Use
+    export_model.get_export_objects() to get the objects an export includes.
+    If apply_modifiers is set, meshes are counted with their modifiers applied,
+    as the export writes them.
+    """
+    objects = list(objects)
+    depsgraph = context.evaluated_depsgraph_get() if apply_modifiers else None
+
+    counts = {
+        "objects": len(objects),
+        "vertices": 0,
+        "faces": 0,
+        "triangles": 0,
+        "bones": 0,
+        "materials": 0,
+    }
+
+    for obj in objects:
+        if obj.type != "MESH":
+            continue
+
+        obj_eval = obj.evaluated_get(depsgraph) if depsgraph else obj
+        mesh = obj_eval.to_mesh()
+        try:
+            counts["vertices"] += len(mesh.vertices)
+            counts["faces"] += len(mesh.polygons)
+            # Every n-gon becomes n - 2 triangles.
+            counts["triangles"] += len(mesh.loops) - 2 * len(mesh.polygons)
+        finally:
+            obj_eval.to_mesh_clear()
+
+    armatures = {
+        obj.data for obj in objects if isinstance(obj.data, bpy.types.Armature)
+    }
+    counts["bones"] = sum(len(armature.bones) for armature in armatures)
+
+    counts["materials"] = len(
+        {
+            slot.material.name
+            for obj in objects
+            for slot in obj.material_slots
+            if slot.material
+        }
+    )
+
+    return counts
+
+
+def _get_phases(events: list[dict[str, Any]]):
+    phases: dict[str, PhaseReport] = {}
+
+    for event in events:
+        if event["cat"] == "operator":
+            continue
+
+        args = event["args"]
+        phase = phases.setdefault(event["name"], PhaseReport(event["name"]))
+        phase.calls += 1
+        phase.seconds += event["dur"] / 1_000_000
+        phase.rss_delta_bytes += args.get("end_rss_bytes", 0) - args.get(
+            "start_rss_bytes", 0
+        )
+        phase.managed_delta_bytes += args.get("end_managed_bytes", 0) - args.get(
+            "start_managed_bytes", 0
+        )
+        phase.peak_rss_bytes = max(
+            phase.peak_rss_bytes, args.get("end_peak_rss_bytes", 0)
+        )
+        phase.peak_rss_increase_bytes += args.get("end_peak_rss_bytes", 0) - args.get(
+            "start_peak_rss_bytes", 0
+        )
+
+    return list(phases.values())
@@ -0,0 +1,116 @@
+"""
+On-disk cache of FBX files converted from AQP models.
+
+Converting an AQP to FBX produces the same file every time for the same input
+and options, so the result is stored under a hash of both. The least recently
+used files are deleted once the cache grows beyond its size limit.
+
+FbxCache does not use bpy, so it may be used from worker threads.
+"""
+
+import hashlib
+import os
+import shutil
+from contextlib import suppress
+from pathlib import Path
+
+import bpy
+
+from . import classes
+from .paths import get_converter_version, get_data_path
+from .preferences import get_preferences
+from .util import OperatorResult
+
+CACHE_DIR_NAME = "fbx_cache"
+
+# Increment this to invalidate all cached files when conversion changes.
+_CACHE_VERSION = 1
+
+
+class FbxCache:
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(*parts: bytes | str | int | bool):
+        """Get a cache key from the model data and conversion options"""
+        digest = hashlib.sha256()
+        digest.update(f"{_CACHE_VERSION};{get_converter_version()};".encode())
+
+        for part in parts:
+            data = part if isinstance(part, bytes) else repr(part).encode()
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Path | None:
+        """Get the path to a cached FBX file, or None if it isn't cached"""
+        path = self._get_path(key)
+
+        try:
+            # Update the modified time to track the most recently used files.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key: str, fbx_path: Path) -> Path:
+        """
+        Move an FBX file into the cache and return its new path.
+        """
+        path = self._get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Move to a temporary name first so a partial file is never visible.
+        tempfile = path.with_suffix(f".{os.getpid()}.tmp")
+        shutil.move(fbx_path, tempfile)
+        tempfile.replace(path)
+
+        self.evict()
+        return path
+
+    def evict(self):
+        """Delete the least recently used files until the cache fits its limit"""
+        files = []
+        for path in self.path.glob("*.fbx"):
+            # Another process sharing the cache may delete files at any time.
+            with suppress(FileNotFoundError):
+                files.append((path, path.stat()))
+
+        files.sort(key=lambda f: f[1].st_mtime, reverse=True)
+
+        total = 0
+        for path, stat in files:
+            total += stat.st_size
+            if total > self.max_bytes:
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _get_path(self, key: str):
+        return self.path / f"{key}.fbx"
+
+
+def get_fbx_cache(context: bpy.types.Context | None) -> FbxCache | None:
+    """Get the FBX cache, or None if it is disabled in preferences"""
+    size_mb = get_preferences(context).fbx_cache_size
+    if size_mb <= 0:
+        return None
+
+    return FbxCache(get_data_path() / CACHE_DIR_NAME, size_mb * 1024 * 1024)
+
+
+@classes.register
+class PSO2_OT_ClearFbxCache(bpy.types.Operator):
+    """Delete all cached FBX files converted from AQP models"""
+
+    bl_label = "Clear FBX Cache"
+    bl_idname = "pso2.clear_fbx_cache"
+
+    def execute(self, context) -> OperatorResult:
+        FbxCache(get_data_path() / CACHE_DIR_NAME, 0).clear()
+        return {"FINISHED"}
@@ -1,12 +1,19 @@
 import ast
+import hashlib
+import importlib.util
+import marshal
+import os
 import re
-from contextlib import contextmanager
+from collections.abc import Callable
+from contextlib import contextmanager, suppress
 from pathlib import Path
+from types import CodeType
 
 import io_scene_fbx.export_fbx_bin
 import io_scene_fbx.import_fbx
 
 from . import scene_props, util
+from .paths import get_data_path
 
 
 @util.copy_signature(io_scene_fbx.import_fbx.load)
@@ -95,7 +102,94 @@ def _compile_function(source: str):
     return next(n for n in mod.body if isinstance(n, ast.FunctionDef))
 
 
-def _get_patched_export_funcs():
+# Increment this to invalidate saved code when the patches change.
+_PATCH_VERSION = 1
+
+_PATCHED_FUNCTIONS = ("fbx_data_armature_elements", "fbx_data_object_elements")
+
+_PATCH_CACHE_DIR_NAME = "fbx_export_patch"
+
+_ExportFuncs = tuple[Callable, Callable]
+_patched_export_funcs: tuple[str, _ExportFuncs] | None = None
+
+
+def _get_patched_export_funcs() -> _ExportFuncs:
+    """
+    Get patched versions of the export functions. Patching them takes a while,
+    so they are built once per session, and the compiled code is also saved to
+    the add-on's data folder to reuse in later sessions. Both are rebuilt if the
+    FBX exporter's source changes.
+    """
+    global _patched_export_funcs
+
+    module_path = Path(io_scene_fbx.export_fbx_bin.__spec__.origin)
+    key = _get_patch_key(module_path)
+
+    if _patched_export_funcs is None or _patched_export_funcs[0] != key:
+        code = _load_patch_code(key)
+        if code is None:
+            code = _compile_patched_export_funcs(module_path)
+            _save_patch_code(key, code)
+
+        ns = {}
+        exec(code, io_scene_fbx.export_fbx_bin.__dict__, ns)
+        funcs = tuple(ns[name] for name in _PATCHED_FUNCTIONS)
+
+        _patched_export_funcs = (key, funcs)
+
+    return _patched_export_funcs[1]
+
+
+def _get_patch_key(module_path: Path):
+    module_stat = module_path.stat()
+    patch_stat = Path(__file__).stat()
+
+    return hashlib.sha256(
+        ";".join(
+            str(part)
+            for part in (
+                _PATCH_VERSION,
+                importlib.util.MAGIC_NUMBER.hex(),
+                module_path,
+                module_stat.st_size,
+                module_stat.st_mtime_ns,
+                patch_stat.st_size,
+                patch_stat.st_mtime_ns,
+            )
+        ).encode()
+    ).hexdigest()
+
+
+def _get_patch_cache_path(key: str):
+    return get_data_path() / _PATCH_CACHE_DIR_NAME / f"{key}.marshal"
+
+
+def _load_patch_code(key: str) -> CodeType | None:
+    try:
+        code = marshal.loads(_get_patch_cache_path(key).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    return code if isinstance(code, CodeType) else None
+
+
+def _save_patch_code(key: str, code: CodeType):
+    path = _get_patch_cache_path(key)
+
+    # The saved code is only an optimization, so ignore any errors writing it.
+    with suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Remove code saved for other versions of the exporter.
+        for old_path in path.parent.glob("*.marshal"):
+            old_path.unlink(missing_ok=True)
+
+        tempfile = path.with_suffix(f".{os.getpid()}.tmp")
+        tempfile.write_bytes(marshal.dumps(code))
+        tempfile.replace(path)
+
+
+def _compile_patched_export_funcs(module_path: Path) -> CodeType:
     # There's no convenient function to replace in the export code. Instead of
     # putting complete copies of the code with patches here, parse the source
     # code and apply patches to the AST to make new functions.
@@ -169,20 +263,16 @@ def pso2_get_bone_name(bone):
     def patch_function(mod: ast.Module, name: str):
         func = _find_function(mod, name)
         func.body.insert(0, get_bone_name)
-        func = ast.fix_missing_locations(RewriteFbxNameClass().visit(func))
-
-        ns = {}
-        exec(ast.unparse(func), io_scene_fbx.export_fbx_bin.__dict__, ns)
-        return ns[name]
+        return ast.fix_missing_locations(RewriteFbxNameClass().visit(func))
 
-    module_path = Path(io_scene_fbx.export_fbx_bin.__spec__.origin)
     source = module_path.read_text(encoding="utf-8")
     mod = ast.parse(source, filename="<export_fbx_bin patched>")
 
-    fbx_data_armature_elements = patch_function(mod, "fbx_data_armature_elements")
-    fbx_data_object_elements = patch_function(mod, "fbx_data_object_elements")
-
-    return fbx_data_armature_elements, fbx_data_object_elements
+    patched = ast.Module(
+        body=[patch_function(mod, name) for name in _PATCHED_FUNCTIONS],
+        type_ignores=[],
+    )
+    return compile(patched, "<export_fbx_bin patched>", "exec")
 
 
 @contextmanager
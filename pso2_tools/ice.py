@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from . import datafile
+from .debug import trace_span
 
 
 @dataclass
@@ -34,16 +35,17 @@ class IceFile:
         from System.IO import FileMode, FileStream
         from Zamboni import IceFile as InternalIceFile
 
-        stream = FileStream(str(path), FileMode.Open)
-        try:
-            ice = InternalIceFile.LoadIceFile(stream)
+        with trace_span("IceFile.load", file=Path(path).name):
+            stream = FileStream(str(path), FileMode.Open)
+            try:
+                ice = InternalIceFile.LoadIceFile(stream)
 
-            group_one = [IceDataFile.from_byte_array(f) for f in ice.groupOneFiles]
-            group_two = [IceDataFile.from_byte_array(f) for f in ice.groupTwoFiles]
+                group_one = [IceDataFile.from_byte_array(f) for f in ice.groupOneFiles]
+                group_two = [IceDataFile.from_byte_array(f) for f in ice.groupTwoFiles]
 
-            return IceFile(group_one, group_two)
-        finally:
-            stream.Close()
+                return IceFile(group_one, group_two)
+            finally:
+                stream.Close()
 
     def __init__(
         self,
@@ -0,0 +1,154 @@
+"""
+In-memory cache of loaded ICE archives.
+
+Loading and decompressing archives is the first thing every import does, so the
+model search starts loading the selected item's archives in the background as
+soon as it is selected. By the time the import starts, they are usually ready.
+
+IceCache does not use bpy, so it may be used from worker threads.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+
+from .ice import IceFile
+
+# Enough for the largest NGS outfits plus their skin textures
+_MAX_BYTES = 512 * 1024 * 1024
+
+_WORKERS = min(4, os.cpu_count() or 1)
+
+_FileKey = tuple[Path, int, int]
+
+
+class IceCache:
+    def __init__(self, max_bytes: int = _MAX_BYTES):
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._files: OrderedDict[_FileKey, tuple[IceFile, int]] = OrderedDict()
+        self._size = 0
+        self._loads: dict[_FileKey, Future[IceFile]] = {}
+        self._prefetches: set[_FileKey] = set()
+        self._pool = ThreadPoolExecutor(_WORKERS, thread_name_prefix="pso2_ice")
+
+    def load(self, path: Path) -> "Future[IceFile]":
+        """
+        Get a future for a loaded archive. It is already done if the archive is
+        cached, or shares the load of a prefetch that is already running.
+        """
+        key = _get_key(path)
+
+        with self._lock:
+            # An archive that is needed now is no longer a stale prefetch.
+            self._prefetches.discard(key)
+            return self._get_or_submit(key)
+
+    def prefetch(self, paths: Iterable[Path]):
+        """
+        Start loading archives in the background, and cancel any earlier
+        prefetches for other archives that haven't started yet.
+        """
+        keys = set()
+        for path in paths:
+            with suppress(FileNotFoundError):
+                keys.add(_get_key(path))
+
+        with self._lock:
+            for key in self._prefetches - keys:
+                if (future := self._loads.get(key)) and future.cancel():
+                    del self._loads[key]
+
+            self._prefetches = {key for key in keys if key not in self._files}
+
+            for key in keys:
+                self._get_or_submit(key)
+
+    def clear(self):
+        with self._lock:
+            for future in self._loads.values():
+                future.cancel()
+
+            self._loads.clear()
+            self._prefetches.clear()
+            self._files.clear()
+            self._size = 0
+
+    def close(self):
+        """Clear the cache and stop its worker threads"""
+        self.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_or_submit(self, key: _FileKey) -> "Future[IceFile]":
+        if cached := self._files.get(key):
+            self._files.move_to_end(key)
+
+            future: Future[IceFile] = Future()
+            future.set_result(cached[0])
+            return future
+
+        future = self._loads.get(key)
+        if future is None or future.cancelled():
+            future = self._pool.submit(self._load, key)
+            self._loads[key] = future
+
+        return future
+
+    def _load(self, key: _FileKey):
+        try:
+            ice = IceFile.load(key[0])
+            size = sum(len(f.data) for f in ice.get_files())
+        except BaseException:
+            # Forget failed loads, so the next request for the archive tries
+            # again instead of getting the same error.
+            with self._lock:
+                self._loads.pop(key, None)
+                self._prefetches.discard(key)
+            raise
+
+        with self._lock:
+            self._loads.pop(key, None)
+            self._prefetches.discard(key)
+
+            if size <= self.max_bytes:
+                self._files[key] = (ice, size)
+                self._size += size
+                self._evict()
+
+        return ice
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            _, (_, size) = self._files.popitem(last=False)
+            self._size -= size
+
+
+def _get_key(path: Path) -> _FileKey:
+    # Include the size and modified time so updated game files are reloaded.
+    stat = path.stat()
+    return (path, stat.st_size, stat.st_mtime_ns)
+
+
+_cache: IceCache | None = None
+
+
+def get_ice_cache():
+    global _cache
+
+    if _cache is None:
+        _cache = IceCache()
+
+    return _cache
+
+
+def clear_ice_cache():
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -3,13 +3,16 @@ from pathlib import Path
 import bpy
 from bpy_extras.io_utils import ImportHelper
 
-from . import classes, import_model, import_props
+from . import classes, import_model, import_progress, import_props
 from .util import OperatorResult
 
 
 @classes.register
 class PSO2_OT_ImportAqp(  # type: ignore https://github.com/nutti/fake-bpy-module/issues/376
-    bpy.types.Operator, import_props.CommonImportProps, ImportHelper
+    bpy.types.Operator,
+    import_props.CommonImportProps,
+    import_progress.ModalImport,
+    ImportHelper,
 ):
     """Load a PSO2 AQP file"""
 
@@ -27,11 +30,13 @@ class PSO2_OT_ImportAqp(  # type: ignore https://github.com/nutti/fake-bpy-modul
     def execute(self, context) -> OperatorResult:
         path = Path(self.filepath)  # type: ignore
 
-        import_model.import_aqp_file(
-            self, context, path, fbx_options=self.get_options()
+        return self.start_import(
+            context,
+            import_model.import_aqp_file_steps(
+                self, context, path, fbx_options=self.get_options()
+            ),
+            trace_name="import_aqp",
         )
 
-        return {"FINISHED"}
-
     def invoke(self, context, event):  # type: ignore https://github.com/nutti/fake-bpy-module/issues/376
         return self.invoke_popup(context)
@@ -1,26 +1,32 @@
-from collections.abc import Iterable
+import os
+from collections.abc import Generator, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from contextlib import closing
 from dataclasses import dataclass, field
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import TypedDict, cast, get_type_hints
+from typing import TypedDict, TypeVar, cast, get_type_hints
 
 import bpy
 
 from . import (
     colors,
     datafile,
+    fbx_cache,
     fbx_wrapper,
     ice,
+    ice_cache,
     material,
     objects,
     objects_aqp,
+    scratch,
     shaders,
 )
-from .debug import debug_pprint, debug_print
+from .debug import debug_pprint, debug_print, trace_span
 from .preferences import get_preferences
 from .util import OperatorResult
 
+T = TypeVar("T")
+
 
 class FbxImportOptions(TypedDict, total=False):
     use_manual_orientation: bool
@@ -51,6 +57,72 @@ class ImportOptions(FbxImportOptions, total=False):
     colors: dict[str, colors.Color]
 
 
+@dataclass
+class ImportStep:
+    """Progress of an import, yielded by import step generators between steps"""
+
+    message: str
+    progress: float = 0
+    "Approximate fraction of the import that is complete, from 0 to 1"
+    wait: Future | None = None
+    "If set, the import cannot continue until this is done"
+
+
+# Import step generators are resumed by later modal timer events. A context is
+# only valid during the event it was passed to, so code after a yield must use
+# bpy.context, which is the current event's context, instead of one from before.
+ImportSteps = Generator[ImportStep, None, OperatorResult]
+
+_LOAD_PROGRESS = 0.1
+_MODELS_PROGRESS = 0.7
+_TEXTURES_PROGRESS = 0.8
+
+
+def run_steps(steps: Generator[ImportStep, None, T]) -> T:
+    """Run an import step generator to completion, blocking until it is done"""
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as ex:
+            return ex.value
+
+        if step.wait:
+            wait([step.wait])
+
+
+class DataSnapshot:
+    """
+    Records the datablocks that exist when created, so any created afterwards,
+    e.g. by a cancelled import, can be removed.
+    """
+
+    _COLLECTIONS = (
+        "actions",
+        "armatures",
+        "collections",
+        "images",
+        "materials",
+        "meshes",
+        "node_groups",
+        "objects",
+    )
+
+    def __init__(self):
+        self._existing = {
+            name: {data.as_pointer() for data in getattr(bpy.data, name)}
+            for name in self._COLLECTIONS
+        }
+
+    def remove_new(self):
+        new_data = [
+            data
+            for name, existing in self._existing.items()
+            for data in getattr(bpy.data, name)
+            if data.as_pointer() not in existing
+        ]
+        bpy.data.batch_remove(new_data)
+
+
 def import_object(
     operator: bpy.types.Operator,
     context: bpy.types.Context,
@@ -58,26 +130,32 @@ def import_object(
     high_quality=True,
     options: ImportOptions | None = None,
 ):
+    return run_steps(import_object_steps(operator, context, obj, high_quality, options))
+
+
+def import_object_steps(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    obj: objects.CmxObjectBase,
+    high_quality=True,
+    options: ImportOptions | None = None,
+) -> ImportSteps:
     debug_print("Importing object:", obj.name)
 
     data_path = get_preferences(context).get_pso2_data_path()
 
-    files = obj.get_files()
-    ice_files = [
-        ice.IceFile.load(p)
-        for f in files
-        if (p := _get_ice_path(f, data_path, high_quality))
-    ]
+    ice_files = yield from _load_ice_files(get_ice_paths(obj, data_path, high_quality))
 
     kwargs = _get_import_kwargs(obj)
 
-    return _import_models(
-        operator,
-        context,
-        ice_files,
-        high_quality=high_quality,
-        options=options,
-        **kwargs,
+    return (
+        yield from _import_models(
+            operator,
+            ice_files,
+            high_quality=high_quality,
+            options=options,
+            **kwargs,
+        )
     )
 
 
@@ -87,6 +165,15 @@ def import_ice_file(
     path: Path,
     options: ImportOptions | None = None,
 ):
+    return run_steps(import_ice_file_steps(operator, context, path, options))
+
+
+def import_ice_file_steps(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    path: Path,
+    options: ImportOptions | None = None,
+) -> ImportSteps:
     debug_print("Importing ICE:", path.name)
 
     file_hash = path.name
@@ -104,13 +191,16 @@ def import_ice_file(
             if isinstance(obj, objects.CmxObjectWithFile):
                 high_quality = file_hash == obj.file.ex.hash
 
-    return _import_models(
-        operator,
-        context,
-        [ice.IceFile.load(path)],
-        options=options,
-        high_quality=high_quality,
-        **kwargs,
+    ice_files = yield from _load_ice_files([path])
+
+    return (
+        yield from _import_models(
+            operator,
+            ice_files,
+            options=options,
+            high_quality=high_quality,
+            **kwargs,
+        )
     )
 
 
@@ -120,6 +210,15 @@ def import_aqp_file(
     path: Path,
     fbx_options: ImportOptions | None = None,
 ):
+    return run_steps(import_aqp_file_steps(operator, context, path, fbx_options))
+
+
+def import_aqp_file_steps(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    path: Path,
+    fbx_options: ImportOptions | None = None,
+) -> ImportSteps:
     debug_print("Importing AQP:", path.name)
 
     kwargs = {}
@@ -128,13 +227,14 @@ def import_aqp_file(
         debug_print(f'Found matching object. Importing with options from "{obj.name}"')
         kwargs = _get_import_kwargs(obj)
 
-    return _import_models(
-        operator,
-        context,
-        [objects_aqp.AqpDataFileSource(path)],
-        options=fbx_options,
-        high_quality=True,
-        **kwargs,
+    return (
+        yield from _import_models(
+            operator,
+            [objects_aqp.AqpDataFileSource(path)],
+            options=fbx_options,
+            high_quality=True,
+            **kwargs,
+        )
     )
 
 
@@ -170,16 +270,81 @@ def collect_model_files(sources: Iterable[datafile.DataFileSource]):
     return result
 
 
+def _find_node_file(model: datafile.DataFile, files: ModelFiles):
+    name = model.name.removesuffix(".aqp")
+    return next(
+        (f for f in files.node_files if f.name.removesuffix(".aqn") == name), None
+    )
+
+
+def _get_worker_count(task_count: int):
+    return max(1, min(task_count, os.cpu_count() or 1))
+
+
+def _wait_for(
+    future: "Future[T]", message: str, progress: float
+) -> Generator[ImportStep, None, T]:
+    if not future.done():
+        yield ImportStep(message, progress, wait=future)
+
+    return future.result()
+
+
+def _load_ice_files(
+    paths: list[Path],
+) -> Generator[ImportStep, None, list[ice.IceFile]]:
+    """
+    Load ICE archives in parallel on worker threads, reusing any that the model
+    search has already prefetched.
+    """
+    result: list[ice.IceFile] = []
+
+    cache = ice_cache.get_ice_cache()
+    loads = [cache.load(path) for path in paths]
+
+    try:
+        for index, future in enumerate(loads):
+            progress = _LOAD_PROGRESS * index / len(loads)
+            result.append((yield from _wait_for(future, "Loading archives", progress)))
+    finally:
+        for future in loads:
+            future.cancel()
+
+    return result
+
+
+def prefetch_object(
+    context: bpy.types.Context, obj: objects.CmxObjectBase, high_quality=True
+):
+    """
+    Start loading the archives that importing an object will need in the
+    background, so the import can start from data that is already in memory.
+    """
+    data_path = get_preferences(context).get_pso2_data_path()
+    paths = get_ice_paths(obj, data_path, high_quality)
+
+    # NGS body parts may need the default skin textures, unless they have
+    # already been imported.
+    if (
+        isinstance(obj, objects.CmxBodyObject)
+        and obj.is_ngs
+        and not material.find_textures("rbd", "sk")
+        and (skin := _get_default_skin(context, use_t2_skin=obj.is_t2))
+    ):
+        paths.extend(get_ice_paths(skin, data_path, high_quality))
+
+    ice_cache.get_ice_cache().prefetch(paths)
+
+
 def _import_models(
     operator: bpy.types.Operator,
-    context: bpy.types.Context,
     sources: Iterable[datafile.DataFileSource],
     options: ImportOptions | None = None,
     high_quality=True,
     use_t2_skin=False,
     color_map: colors.ColorMapping | None = None,
     uv_map: material.UVMapping | None = None,
-) -> OperatorResult:
+) -> ImportSteps:
     debug_print(f"Import: {high_quality=} {use_t2_skin=} {color_map=}")
     debug_print(f"Options: {options=}")
 
@@ -188,26 +353,61 @@ def _import_models(
     original_mat_keys = set(bpy.data.materials.keys())
     materials: list[material.Material] = []
 
-    for model in files.model_files:
-        debug_print("Importing", model.name)
-        name = model.name.removesuffix(".aqp")
-        aqn = next(
-            (f for f in files.node_files if f.name.removesuffix(".aqn") == name), None
-        )
+    cache = fbx_cache.get_fbx_cache(bpy.context)
+
+    # Converting models to FBX doesn't touch Blender data, so convert all models
+    # in parallel and import each one in order as soon as it is ready.
+    pool = ThreadPoolExecutor(_get_worker_count(len(files.model_files)))
+
+    with scratch.get_scratch_space(bpy.context).directory("import") as tempdir:
+        try:
+            conversions = [
+                pool.submit(
+                    convert_aqp,
+                    model,
+                    _find_node_file(model, files),
+                    tempdir / f"{index}_{Path(model.name).with_suffix('.fbx')}",
+                    options=options,
+                    cache=cache,
+                )
+                for index, model in enumerate(files.model_files)
+            ]
+
+            for index, future in enumerate(conversions):
+                name = files.model_files[index].name
+                progress = _LOAD_PROGRESS + (
+                    (_MODELS_PROGRESS - _LOAD_PROGRESS) * index / len(conversions)
+                )
+
+                converted = yield from _wait_for(future, f"Converting {name}", progress)
+                debug_print(
+                    "Importing", converted.name, "(cached)" if converted.cached else ""
+                )
+
+                result = _import_aqp(operator, bpy.context, converted, options=options)
+                if "FINISHED" not in result:
+                    return result
+
+                materials.extend(converted.materials)
+                yield ImportStep(f"Imported {name}", progress)
+        finally:
+            # If the import was cancelled, don't block Blender waiting for the
+            # conversions that are still running. Their results are discarded.
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        result, new_materials = _import_aqp(
-            operator,
-            context,
-            model,
-            aqn,
-            options=options,
-        )
-        if "FINISHED" not in result:
-            return result
+    new_mat_keys = set(bpy.data.materials.keys()).difference(original_mat_keys)
 
-        materials.extend(new_materials)
+    textures: list[bpy.types.Image] = []
 
-    new_mat_keys = set(bpy.data.materials.keys()).difference(original_mat_keys)
+    # Spans must not include a yield, or they would also time the wait for the
+    # next modal timer event. import_data_image() records its own span.
+    for index, tex in enumerate(files.texture_files):
+        textures.append(import_data_image(tex))
+
+        progress = _MODELS_PROGRESS + (
+            (_TEXTURES_PROGRESS - _MODELS_PROGRESS) * index / len(files.texture_files)
+        )
+        yield ImportStep(f"Imported {tex.name}", progress)
 
     model_materials = material.ModelMaterials(
         materials={
@@ -215,18 +415,18 @@ def _import_models(
             for key in new_mat_keys
             if (mat := material.find_material(key, materials))
         },
-        textures=[import_data_image(tex) for tex in files.texture_files],
+        textures=textures,
     )
 
     if options and (import_colors := options.get("colors")):
-        _set_scene_colors(context, import_colors)
+        _set_scene_colors(bpy.context, import_colors)
 
     # Collect extra textures that are not part of the model but are used by it.
     if model_materials.has_skin_material:
         model_materials.skin_textures = material.find_textures("rbd", "sk")
         if not model_materials.skin_textures:
-            model_materials.skin_textures = _import_skin_textures(
-                context, high_quality, use_t2_skin
+            model_materials.skin_textures = yield from _import_skin_textures(
+                bpy.context, high_quality, use_t2_skin
             )
 
         if not model_materials.has_linked_inner_textures:
@@ -252,14 +452,20 @@ def _import_models(
     debug_print("IMPORT MATERIALS:")
     debug_pprint(model_materials.materials)
 
-    for key, mat in model_materials.materials.items():
+    for index, (key, mat) in enumerate(model_materials.materials.items()):
         data = shaders.types.ShaderData(
             material=mat,
             textures=model_materials.get_textures(mat),
             color_map=color_map or colors.ColorMapping(),
             uv_map=uv_map,
         )
-        shaders.build_material(context, bpy.data.materials[key], data)
+        with trace_span("shaders.build_material", material=key):
+            shaders.build_material(bpy.context, bpy.data.materials[key], data)
+
+        progress = _TEXTURES_PROGRESS + (
+            (1 - _TEXTURES_PROGRESS) * index / len(model_materials.materials)
+        )
+        yield ImportStep(f"Built material {key}", progress)
 
     return {"FINISHED"}
 
@@ -271,6 +477,17 @@ def _set_scene_colors(
         setattr(context.scene, key, value)
 
 
+def get_ice_paths(
+    obj: objects.CmxObjectBase, data_path: Path, high_quality: bool
+) -> list[Path]:
+    """Get the paths to the ICE archives that importing an object loads"""
+    return [
+        path
+        for f in obj.get_files()
+        if (path := _get_ice_path(f, data_path, high_quality))
+    ]
+
+
 def _get_ice_path(filename: objects.CmxFileName, data_path: Path, high_quality: bool):
     if high_quality and (path := filename.ex.path(data_path)):
         return path
@@ -288,8 +505,11 @@ def _delete_empty_images():
 
 
 def import_data_image(data: datafile.DataFile):
-    with TemporaryDirectory() as tempdir:
-        tempfile = Path(tempdir) / data.name
+    with (
+        trace_span("import_data_image", file=data.name),
+        scratch.get_scratch_space(bpy.context).directory("import_image") as tempdir,
+    ):
+        tempfile = tempdir / data.name
 
         with tempfile.open("wb") as f:
             f.write(data.data)
@@ -314,13 +534,26 @@ def import_image(path: Path):
     return image
 
 
-def _import_aqp(
-    operator: bpy.types.Operator,
-    context: bpy.types.Context,
+@dataclass
+class ConvertedModel:
+    name: str
+    fbx_path: Path
+    materials: list[material.Material]
+    cached: bool = False
+
+
+def convert_aqp(
     aqp: Path | datafile.DataFile,
     aqn: Path | datafile.DataFile | None,
+    fbx_path: Path,
     options: ImportOptions | None = None,
-) -> tuple[OperatorResult, list[material.Material]]:
+    cache: fbx_cache.FbxCache | None = None,
+) -> ConvertedModel:
+    """
+    Convert an AQP model to an FBX file at fbx_path, or find it in the cache.
+
+    This does not use bpy, so it is safe to run on a worker thread.
+    """
     from AquaModelLibrary.Core.General import FbxExporterNative
     from AquaModelLibrary.Data.PSO2.Aqua import AquaMotion, AquaNode, AquaPackage
     from AquaModelLibrary.Data.Utility import CoordSystem
@@ -336,105 +569,131 @@ def _import_aqp(
         aqp_data = aqp.data
         aqp_name = aqp.name
 
-    package = AquaPackage(aqp_data)
-    model = package.models[0]
+    with trace_span("AquaPackage", file=aqp_name):
+        package = AquaPackage(aqp_data)
+        model = package.models[0]
 
-    # TODO: for linked outerwear, just get the material info from the model
-    # but don't import the model.
+        # TODO: for linked outerwear, just get the material info from the model
+        # but don't import the model.
 
-    if aqn is not None:
-        aqn_data = aqn.read_bytes() if isinstance(aqn, Path) else aqn.data
-        skeleton = AquaNode(aqn_data)
-    else:
-        skeleton = AquaNode.GenerateBasicAQN()
+        if aqn is not None:
+            aqn_data = aqn.read_bytes() if isinstance(aqn, Path) else aqn.data
+            skeleton = AquaNode(aqn_data)
+        else:
+            aqn_data = b""
+            skeleton = AquaNode.GenerateBasicAQN()
 
-    if model.objc.type > 0xC32:
-        model.splitVSETPerMesh()
+        if model.objc.type > 0xC32:
+            model.splitVSETPerMesh()
 
-    model.FixHollowMatNaming()
+        model.FixHollowMatNaming()
 
     # TODO: support importing motion files
     aqms = List[AquaMotion]()
     aqm_names = List[str]()
     instance_transforms = List[Matrix4x4]()
 
-    with TemporaryDirectory() as tempdir:
-        fbxfile = Path(tempdir) / Path(aqp_name).with_suffix(".fbx")
-
-        FbxExporterNative.ExportToFile(
-            aqo=model,
-            aqn=skeleton,
-            aqmList=aqms,
-            destinationFilePath=str(fbxfile),
-            aqmNameList=aqm_names,
-            instanceTransforms=instance_transforms,  # type: ignore
-            includeMetadata=True,
-            coordSystem=int(CoordSystem.OpenGL),
-            excludeTangentBinormal=not options.get("include_tangent_binormal", False),
-        )
+    coord_system = int(CoordSystem.OpenGL)
+    exclude_tangent_binormal = not options.get("include_tangent_binormal", False)
+
+    cache_key = fbx_cache.FbxCache.make_key(
+        aqp_data, aqn_data, coord_system, exclude_tangent_binormal
+    )
+
+    cached_path = cache.get(cache_key) if cache else None
+
+    if cached_path is None:
+        with trace_span("FbxExporterNative.ExportToFile", file=aqp_name):
+            FbxExporterNative.ExportToFile(
+                aqo=model,
+                aqn=skeleton,
+                aqmList=aqms,
+                destinationFilePath=str(fbx_path),
+                aqmNameList=aqm_names,
+                instanceTransforms=instance_transforms,  # type: ignore
+                includeMetadata=True,
+                coordSystem=coord_system,
+                excludeTangentBinormal=exclude_tangent_binormal,
+            )
+
+        if cache:
+            fbx_path = cache.put(cache_key, fbx_path)
+    else:
+        fbx_path = cached_path
 
-        fbx_options = _get_fbx_options(options)
+    mesh_mat_mapping = List[int]()
+    generic_materials, _ = model.GetUniqueMaterials(mesh_mat_mapping)
+
+    materials = [
+        material.Material.from_generic_material(mat) for mat in generic_materials
+    ]
+
+    return ConvertedModel(
+        name=aqp_name,
+        fbx_path=fbx_path,
+        materials=materials,
+        cached=cached_path is not None,
+    )
 
+
+def _import_aqp(
+    operator: bpy.types.Operator,
+    context: bpy.types.Context,
+    converted: ConvertedModel,
+    options: ImportOptions | None = None,
+) -> OperatorResult:
+    fbx_options = _get_fbx_options(options or {})
+
+    with trace_span("fbx_wrapper.load", file=converted.name):
         result = cast(
             "OperatorResult",
             fbx_wrapper.load(
                 operator,
                 context,
-                filepath=str(fbxfile),
+                filepath=str(converted.fbx_path),
                 **fbx_options,
             ),
         )
-        if result != {"FINISHED"}:
-            return (result, [])
-
-        if context.selected_objects is None:
-            raise TypeError()
+    if result != {"FINISHED"}:
+        return result
 
-        if get_preferences(context).hide_armature:
-            for obj in context.selected_objects:
-                if obj.type == "ARMATURE":
-                    obj.hide_set(True)
+    if context.selected_objects is None:
+        raise TypeError()
 
+    if get_preferences(context).hide_armature:
         for obj in context.selected_objects:
-            debug_print(obj.type, obj.name)
+            if obj.type == "ARMATURE":
+                obj.hide_set(True)
 
-    mesh_mat_mapping = List[int]()
-    generic_materials, _ = model.GetUniqueMaterials(mesh_mat_mapping)
-
-    materials = [
-        material.Material.from_generic_material(mat) for mat in generic_materials
-    ]
+    for obj in context.selected_objects:
+        debug_print(obj.type, obj.name)
 
-    return {"FINISHED"}, materials
+    return {"FINISHED"}
 
 
 def _import_skin_textures(
     context: bpy.types.Context, high_quality: bool, use_t2_skin: bool
-) -> list[bpy.types.Image]:
-    preferences = get_preferences(context)
-    data_path = preferences.get_pso2_data_path()
-
-    skin_id = int(
-        preferences.default_skin_t2 if use_t2_skin else preferences.default_skin_t1
-    )
-
-    with closing(objects.ObjectDatabase(context)) as db:
-        result = db.get_skins(item_id=skin_id)
+) -> Generator[ImportStep, None, list[bpy.types.Image]]:
+    data_path = get_preferences(context).get_pso2_data_path()
 
-    if not result:
+    if not (skin := _get_default_skin(context, use_t2_skin)):
         return []
 
-    skin = result[0]
-    files = skin.get_files()
-    ice_files = [
-        ice.IceFile.load(p)
-        for f in files
-        if (p := _get_ice_path(f, data_path, high_quality))
-    ]
+    ice_files = yield from _load_ice_files(get_ice_paths(skin, data_path, high_quality))
 
     skin_textures = collect_model_files(ice_files).texture_files
 
-    return [import_data_image(tex) for tex in skin_textures]
+    with trace_span("import skin textures", count=len(skin_textures)):
+        return [import_data_image(tex) for tex in skin_textures]
+
+
+def _get_default_skin(context: bpy.types.Context, use_t2_skin: bool):
+    preferences = get_preferences(context)
+    skin_id = int(
+        preferences.default_skin_t2 if use_t2_skin else preferences.default_skin_t1
+    )
+
+    return objects.get_skin_catalogue(context).get(skin_id)
 
 
 def _get_uv_map(obj: objects.CmxBodyObject):
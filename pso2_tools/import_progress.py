@@ -0,0 +1,126 @@
+import traceback
+from contextlib import ExitStack
+from typing import cast
+
+import bpy
+
+from . import import_model
+from .debug import trace_operator
+from .util import OperatorResult
+
+_TIMER_INTERVAL = 0.05
+
+
+class ModalImport:
+    """
+    Operator mixin which runs an import step generator from a modal timer, so
+    Blender stays responsive, shows progress, and can cancel the import with Esc.
+    """
+
+    _steps: import_model.ImportSteps
+    _step: import_model.ImportStep | None
+    _snapshot: import_model.DataSnapshot
+    _timer: bpy.types.Timer | None
+    _exit_stack: ExitStack
+
+    def start_import(
+        self,
+        context: bpy.types.Context,
+        steps: import_model.ImportSteps,
+        trace_name: str,
+    ) -> OperatorResult:
+        """
+        Start running an import. Call this from execute() and return its result.
+        context is only used to start the import. The steps are resumed from
+        later modal() calls, so they must use bpy.context after their first
+        yield (see import_model.ImportSteps).
+        """
+        window_manager = context.window_manager
+
+        # Modal operators need a window. Run to completion if there isn't one,
+        # e.g. when running from a script in the background.
+        if bpy.app.background or context.window is None or window_manager is None:
+            with trace_operator(context, trace_name):
+                return import_model.run_steps(steps)
+
+        self._steps = steps
+        self._step = None
+        self._snapshot = import_model.DataSnapshot()
+        self._exit_stack = ExitStack()
+        self._exit_stack.enter_context(trace_operator(context, trace_name))
+
+        self._timer = window_manager.event_timer_add(
+            _TIMER_INTERVAL, window=context.window
+        )
+        window_manager.modal_handler_add(cast("bpy.types.Operator", self))
+        window_manager.progress_begin(0, 100)
+
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context: bpy.types.Context, event: bpy.types.Event):
+        operator = cast("bpy.types.Operator", self)
+
+        if event.type == "ESC":
+            self._cancel(context)
+            operator.report({"WARNING"}, "Import cancelled")
+            return {"CANCELLED"}
+
+        if event.type != "TIMER":
+            return {"PASS_THROUGH"}
+
+        # Don't resume until background work the last step is waiting on is done.
+        if self._step and self._step.wait and not self._step.wait.done():
+            return {"RUNNING_MODAL"}
+
+        try:
+            self._step = next(self._steps)
+        except StopIteration as ex:
+            self._finish(context)
+            return ex.value
+        except Exception as ex:
+            traceback.print_exc()
+            self._cancel(context)
+            operator.report({"ERROR"}, f"Import failed: {ex}")
+            return {"CANCELLED"}
+
+        self._show_progress(context, self._step)
+        return {"RUNNING_MODAL"}
+
+    def cancel(self, context: bpy.types.Context):
+        # Blender calls this if the operator is stopped without finishing, e.g.
+        # when a file is loaded or the window is closed.
+        self._cancel(context)
+
+    def __del__(self):
+        # Fallback in case the operator is freed without being cancelled. An
+        # open trace would stop any later operator from writing its own trace.
+        if exit_stack := getattr(self, "_exit_stack", None):
+            exit_stack.close()
+
+    def _show_progress(self, context: bpy.types.Context, step: import_model.ImportStep):
+        if context.window_manager:
+            context.window_manager.progress_update(int(step.progress * 100))
+
+        if context.workspace:
+            context.workspace.status_text_set(
+                f"PSO2 import: {step.message} ({step.progress:.0%}). Press Esc to cancel."
+            )
+
+    def _cancel(self, context: bpy.types.Context):
+        # Closing the generator stops any remaining background work.
+        self._steps.close()
+        self._snapshot.remove_new()
+        self._finish(context)
+
+    def _finish(self, context: bpy.types.Context):
+        if context.window_manager:
+            if self._timer:
+                context.window_manager.event_timer_remove(self._timer)
+                self._timer = None
+
+            context.window_manager.progress_end()
+
+        if context.workspace:
+            context.workspace.status_text_set(None)
+
+        self._exit_stack.close()
@@ -1,17 +1,27 @@
-import math
-import sys
+import fnmatch
+import re
 import time
 from collections.abc import Iterable, Sequence
 from contextlib import closing
-from dataclasses import dataclass, fields
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, cast
+from typing import Any
 
 import bpy
-
-from . import ccl, classes, import_model, import_props, objects
+import numpy as np
+
+from . import (
+    ccl,
+    classes,
+    collation,
+    import_model,
+    import_progress,
+    import_props,
+    objects,
+    previews,
+)
 from .colors import COLOR_CHANNELS, Color, ColorId
-from .debug import debug_print
+from .debug import debug_print, trace_span
 from .preferences import (
     Pso2ToolsPreferences,
     color_property,
@@ -24,12 +34,19 @@ from .util import BlenderIcon, OperatorResult
 class ModelMetadata:
     has_linked_inner: bool = False
     has_linked_outer: bool = False
+    has_high_quality: bool = False
+    has_normal_quality: bool = False
     leg_length: float | None = None
 
     @classmethod
     def from_object(cls, obj: objects.CmxObjectBase, data_path: Path):
         result = cls()
 
+        file: objects.CmxFileName | None = getattr(obj, "file", None)
+        if file:
+            result.has_high_quality = file.ex.exists(data_path)
+            result.has_normal_quality = file.exists(data_path)
+
         if isinstance(obj, objects.CmxBodyObject):
             result.leg_length = obj.leg_length
             result.has_linked_inner = obj.linked_inner_file.exists(data_path)
@@ -37,70 +54,25 @@ class ModelMetadata:
 
         return result
 
+    def get_file_items(self):
+        items: list[tuple[str, str, str]] = []
 
-@classes.register
-class FloatItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
-    value: bpy.props.FloatProperty(name="Value")
-
-
-@classes.register
-class IntItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
-    value: bpy.props.IntProperty(name="Value")
-
-    INVALID = sys.maxsize
-
-
-@classes.register
-class StringItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
-    value: bpy.props.StringProperty(name="Value")
+        if self.has_high_quality:
+            items.append(("HQ", "High Quality", "Select high quality model"))
 
+        if self.has_normal_quality:
+            items.append(("NQ", "Normal Quality", "Select normal quality model"))
 
-@classes.register
-class FileNameItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
-    value: bpy.props.StringProperty(name="File Name")
-
-    def to_file_name(self):
-        return objects.CmxFileName(self.value)
-
-
-@classes.register
-class ColorMapItem(bpy.types.PropertyGroup):
-    name: bpy.props.StringProperty(name="Name")
-    red: bpy.props.IntProperty(name="Red Channel")
-    green: bpy.props.IntProperty(name="Green Channel")
-    blue: bpy.props.IntProperty(name="Blue Channel")
-    alpha: bpy.props.IntProperty(name="Alpha Channel")
-
-    def to_color_map(self):
-        return objects.CmxColorMapping(
-            red=ColorId(self.red),
-            green=ColorId(self.green),
-            blue=ColorId(self.blue),
-            alpha=ColorId(self.alpha),
-        )
+        return items
 
 
-_GENDERED_OBJECT_TYPES = [
-    str(objects.ObjectType.BASEWEAR),
-    str(objects.ObjectType.BODYPAINT),
-    str(objects.ObjectType.CAST_ARMS),
-    str(objects.ObjectType.CAST_BODY),
-    str(objects.ObjectType.CAST_LEGS),
-    str(objects.ObjectType.COSTUME),
-    str(objects.ObjectType.FACE),
-    str(objects.ObjectType.FACE_TEXTURE),
-    str(objects.ObjectType.INNERWEAR),
-    str(objects.ObjectType.OUTERWEAR),
-    str(objects.ObjectType.SKIN),
-]
+@dataclass
+class Selection:
+    """The full object and metadata for the selected item in the model search"""
 
-_VERSIONLESS_OBJECT_TYPES = [
-    str(objects.ObjectType.STICKER),
-]
+    obj: objects.CmxObjectBase
+    metadata: ModelMetadata
+    file_items: list[tuple[str, str, str]]
 
 
 @classes.register
@@ -136,23 +108,18 @@ class ListItem(bpy.types.PropertyGroup):
     object_id: bpy.props.IntProperty(name="ID")
     adjusted_id: bpy.props.IntProperty(name="Adjusted ID")
 
-    files: bpy.props.CollectionProperty(type=FileNameItem)
-    float_fields: bpy.props.CollectionProperty(type=FloatItem)
-    int_fields: bpy.props.CollectionProperty(type=IntItem)
-    string_fields: bpy.props.CollectionProperty(type=StringItem)
-    color_map_fields: bpy.props.CollectionProperty(type=ColorMapItem)
-
     # Extra metadata for sort
     leg_length: bpy.props.FloatProperty(name="Leg Length")
+    alpha_rank: bpy.props.IntProperty(name="Alphabetical Sort Rank")
+    id_rank: bpy.props.IntProperty(name="ID Sort Rank")
+    leg_length_rank: bpy.props.IntProperty(name="Leg Length Sort Rank")
+    search_key_en: bpy.props.StringProperty(name="English Search Key")
+    search_key_jp: bpy.props.StringProperty(name="Japanese Search Key")
 
     @property
     def item_name(self) -> str:
         return self.name_en or self.name_jp or f"Unnamed {self.object_id}"
 
-    @property
-    def sort_name(self) -> str:
-        return self.name_en or self.name_jp or f"\uffff {self.object_id}"
-
     @property
     def description(self):
         enum_items = self.bl_rna.properties["object_type"].enum_items  # type: ignore
@@ -162,137 +129,41 @@ class ListItem(bpy.types.PropertyGroup):
 
         return desc
 
-    def populate(self, obj: objects.CmxObjectBase):
-        self.object_type = str(obj.object_type)
-        self.object_id = obj.id
-        self.adjusted_id = obj.adjusted_id
-        self.name_en = obj.name_en
-        self.name_jp = obj.name_jp
-
-        if isinstance(obj, objects.CmxBodyObject) and obj.leg_length is not None:
-            self.leg_length = obj.leg_length
-        else:
-            self.leg_length = 0
-
-        for field in fields(obj):
-            if field.name in ("object_type", "id", "adjusted_id", "name_en", "name_jp"):
-                continue
-
-            name = field.name
-            value = getattr(obj, name)
-
-            if field.type in (float, float | None):
-                prop = cast("FloatItem", self.float_fields.add())
-                prop.name = name
-                prop.value = math.nan if value is None else value
-
-            elif field.type in (int, int | None):
-                prop = cast("IntItem", self.float_fields.add())
-                prop.name = name
-                prop.value = IntItem.INVALID if value is None else value
-
-            elif field.type is str:
-                prop = cast("StringItem", self.string_fields.add())
-                prop.name = name
-                prop.value = value
-
-            elif field.type == objects.CmxFileName:
-                prop = cast("FileNameItem", self.files.add())
-                prop.name = name
-                prop.value = value.name
-
-            elif field.type == objects.CmxColorMapping:
-                prop = cast("ColorMapItem", self.color_map_fields.add())
-                prop.name = name
-                prop.red = int(value.red)
-                prop.green = int(value.green)
-                prop.blue = int(value.blue)
-                prop.alpha = int(value.alpha)
-
-            else:
-                raise NotImplementedError(f"Unhandled field type {field.type}")
-
-    def to_object(self):
-        object_type = objects.ObjectType(self.object_type)
-        cls = _get_object_class(object_type)
-        obj = cls(
-            object_type=object_type,
-            id=self.object_id,
-            adjusted_id=self.adjusted_id,
-            name_en=self.name_en,
-            name_jp=self.name_jp,
-        )
-
-        for file_item in self.files:
-            setattr(obj, file_item.name, file_item.to_file_name())
-
-        for float_item in self.float_fields:
-            setattr(
-                obj,
-                float_item.name,
-                None if math.isnan(float_item.value) else float_item.value,
-            )
-
-        for int_item in self.int_fields:
-            setattr(
-                obj,
-                int_item.name,
-                None if int_item.value == IntItem.INVALID else int_item.value,
-            )
-
-        for str_item in self.string_fields:
-            setattr(obj, str_item.name, str_item.value)
-
-        for color_item in self.color_map_fields:
-            setattr(obj, color_item.name, color_item.to_color_map())
-
-        return obj
+    def populate(self, entry: objects.CmxListEntry):
+        self.object_type = str(entry.object_type)
+        self.object_id = entry.id
+        self.adjusted_id = entry.adjusted_id
+        self.name_en = entry.name_en
+        self.name_jp = entry.name_jp
+        self.leg_length = entry.leg_length or 0
+        self.alpha_rank = entry.alpha_rank
+        self.id_rank = entry.id_rank
+        self.leg_length_rank = entry.leg_length_rank
+        self.search_key_en = entry.search_key_en
+        self.search_key_jp = entry.search_key_jp
+
+
+# The model list is kept on the window manager instead of the operator so it can
+# be reused each time the model search is opened. It is not saved to files.
+MODEL_LIST = "pso2_model_list"
+
+
+def register_properties():
+    setattr(
+        bpy.types.WindowManager,
+        MODEL_LIST,
+        bpy.props.CollectionProperty(name="Models", type=ListItem),
+    )
 
 
-def _get_object_class(object_type: objects.ObjectType) -> type[objects.CmxObjectBase]:
-    match object_type:
-        case objects.ObjectType.ACCESSORY:
-            return objects.CmxAccessory
-        case (
-            objects.ObjectType.BASEWEAR
-            | objects.ObjectType.COSTUME
-            | objects.ObjectType.OUTERWEAR
-        ):
-            return objects.CmxBodyObject
-        case (
-            objects.ObjectType.CAST_ARMS
-            | objects.ObjectType.CAST_BODY
-            | objects.ObjectType.CAST_LEGS
-        ):
-            return objects.CmxBodyObject
-        case objects.ObjectType.BODYPAINT | objects.ObjectType.INNERWEAR:
-            return objects.CmxBodyPaint
-        case objects.ObjectType.EAR:
-            return objects.CmxEarObject
-        case objects.ObjectType.EYE:
-            return objects.CmxEyeObject
-        case objects.ObjectType.EYEBROW | objects.ObjectType.EYELASH:
-            return objects.CmxEyebrowObject
-        case objects.ObjectType.FACE:
-            return objects.CmxFaceObject
-        case objects.ObjectType.FACE_TEXTURE | objects.ObjectType.FACEPAINT:
-            return objects.CmxFacePaint
-        case objects.ObjectType.HAIR:
-            return objects.CmxHairObject
-        case objects.ObjectType.HORN:
-            return objects.CmxHornObject
-        case objects.ObjectType.SKIN:
-            return objects.CmxSkinObject
-        case objects.ObjectType.STICKER:
-            return objects.CmxSticker
-        case objects.ObjectType.TEETH:
-            return objects.CmxTeethObject
-        case _:
-            raise NotImplementedError(f"Unhandled item type {object_type}")
+def unregister_properties():
+    delattr(bpy.types.WindowManager, MODEL_LIST)
 
 
 @classes.register
-class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
+class PSO2_OT_ModelSearch(
+    bpy.types.Operator, import_props.CommonImportProps, import_progress.ModalImport
+):
     """Search for PSO2 character models"""
 
     bl_label = "Import PSO2 Character Model"
@@ -306,17 +177,21 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
     _color_set_item_cache: ListItem | None = None
     _color_set_enum_cache: list[tuple[str, str, str, int]] = []
 
+    # The list only holds enough to show each item, so the full object for the
+    # selected item is read from the database. It is kept along with its metadata,
+    # which needs to check the data folder for files, until the selection or the
+    # data folder changes. This also keeps the file enum items alive.
+    _selection_key: tuple[str, int, Path] | None = None
+    _selection: Selection | None = None
+
     def _get_selected_model_files(
         self,
         context: bpy.types.Context | None,
     ) -> Iterable[tuple[str, str, str]]:
-        try:
-            selected: ListItem = self.models[self.models_index]
-        except IndexError:
+        if not (selection := _get_selection(self, context)):
             return []
 
-        data_path = get_preferences(context).get_pso2_data_path()
-        return _get_file_items(selected.files, data_path)
+        return selection.file_items
 
     def _get_selected_model_colors(
         self,
@@ -325,9 +200,7 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
         if context is None:
             return []
 
-        try:
-            selected: ListItem = self.models[self.models_index]
-        except IndexError:
+        if not (selected := _get_selected_item(self)):
             return []
 
         if selected == PSO2_OT_ModelSearch._color_set_item_cache:
@@ -341,9 +214,7 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
         return items
 
     def _update_color_set_colors(self, context: bpy.types.Context):
-        try:
-            item: ListItem = self.models[self.models_index]
-        except IndexError:
+        if not (item := _get_selected_item(self)):
             return
 
         if (
@@ -363,11 +234,22 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
             self.color_set_channel_1 = ""
             self.color_set_channel_2 = ""
 
-    models: bpy.props.CollectionProperty(name="Models", type=ListItem)
+    def _prefetch_selected_model(self, context: bpy.types.Context):
+        if obj := self.get_selected_object():
+            import_model.prefetch_object(
+                context, obj, high_quality=self.model_file == "HQ"
+            )
+
+    def _handle_selection_change(self, context: bpy.types.Context):
+        self._update_color_set_colors(context)
+        self._prefetch_selected_model(context)
+
     models_index: bpy.props.IntProperty(
-        name="Selected Index", default=-1, update=_update_color_set_colors
+        name="Selected Index", default=-1, update=_handle_selection_change
+    )
+    model_file: bpy.props.EnumProperty(
+        name="File", items=_get_selected_model_files, update=_prefetch_selected_model
     )
-    model_file: bpy.props.EnumProperty(name="File", items=_get_selected_model_files)
 
     color_set: bpy.props.EnumProperty(
         name="Color Set",
@@ -385,17 +267,27 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
     color_set_channel_2: bpy.props.StringProperty()
 
     def _handle_database_update(self, context: bpy.types.Context):
-        _populate_model_list(self.models, context)
+        _clear_selection()
+        _update_model_list(context, force=True)
 
     handle_database_update: bpy.props.BoolProperty(update=_handle_database_update)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        _populate_model_list(self.models, bpy.context)
+
+        start = time.perf_counter()
+        reloaded = _update_model_list(bpy.context)
+        end = time.perf_counter()
+
+        debug_print(
+            f"PSO2 model search opened in {(end - start) * 1000:0.1f}ms "
+            f"({'reloaded' if reloaded else 'reused'} model list)"
+        )
 
     def __del__(self):
         PSO2_OT_ModelSearch._color_set_item_cache = None
         PSO2_OT_ModelSearch._color_set_enum_cache = []
+        _clear_selection()
 
     def draw(self, context):
         assert self.layout is not None
@@ -410,8 +302,8 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
         col.template_list(
             PSO2_UL_ModelList.bl_idname,
             "",
-            self,
-            "models",
+            context.window_manager,
+            MODEL_LIST,
             self,
             "models_index",
             rows=16,
@@ -421,8 +313,14 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
         col.use_property_split = True
         col.use_property_decorate = False
 
-        if obj := self.get_selected_object():
-            meta = ModelMetadata.from_object(obj, preferences.get_pso2_data_path())
+        if selection := _get_selection(self, context):
+            obj = selection.obj
+            meta = selection.metadata
+
+            if (item := _get_selected_item(self)) and (
+                icon_value := _get_preview_icon(context, item)
+            ):
+                col.template_icon(icon_value=icon_value, scale=6)
 
             row = col.row()
             row.use_property_split = False
@@ -479,14 +377,17 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
     def execute(self, context) -> OperatorResult:
         if obj := self.get_selected_object():
             high_quality = self.model_file == "HQ"
-            import_model.import_object(
-                self,
+            return self.start_import(
                 context,
-                obj,
-                high_quality=high_quality,
-                options=self.get_object_options(obj),
+                import_model.import_object_steps(
+                    self,
+                    context,
+                    obj,
+                    high_quality=high_quality,
+                    options=self.get_object_options(obj),
+                ),
+                trace_name="model_search",
             )
-            return {"FINISHED"}
 
         return {"CANCELLED"}
 
@@ -503,7 +404,6 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
     def get_object_options(self, obj: objects.CmxObjectBase):
         options = super().get_options(
             ignore=(
-                "models",
                 "models_index",
                 "model_file",
                 "color_set",
@@ -552,34 +452,84 @@ class PSO2_OT_ModelSearch(bpy.types.Operator, import_props.CommonImportProps):
         return preferences, channel.prop, True
 
 
-def _get_selected_object(self: PSO2_OT_ModelSearch) -> objects.CmxObjectBase | None:
+def _get_model_list(context: bpy.types.Context | None = None) -> Sequence[ListItem]:
+    window_manager = (context or bpy.context).window_manager
+    return getattr(window_manager, MODEL_LIST)
+
+
+def _get_selected_item(self: PSO2_OT_ModelSearch) -> ListItem | None:
     if self.models_index < 0:
         return None
 
     try:
-        return self.models[self.models_index].to_object()
+        return _get_model_list()[self.models_index]
     except IndexError:
         return None
 
 
-def _get_file_items(items: Iterable[FileNameItem], data_path: Path):
-    item = next((item for item in items if item.name == "file"), None)
-    if item is None:
-        return
+def _get_selection(
+    self: PSO2_OT_ModelSearch, context: bpy.types.Context | None
+) -> Selection | None:
+    if not (item := _get_selected_item(self)):
+        return None
+
+    context = context or bpy.context
+    data_path = get_preferences(context).get_pso2_data_path()
 
-    normal = item.to_file_name()
-    high = normal.ex
+    key = (item.object_type, item.object_id, data_path)
+    if key != PSO2_OT_ModelSearch._selection_key:
+        with closing(objects.ObjectDatabase(context)) as db:
+            obj = db.get_object(objects.ObjectType(item.object_type), item.object_id)
 
-    if high.exists(data_path):
-        yield ("HQ", "High Quality", "Select high quality model")
+        if obj:
+            metadata = ModelMetadata.from_object(obj, data_path)
+            selection = Selection(obj, metadata, metadata.get_file_items())
+        else:
+            selection = None
 
-    if normal.exists(data_path):
-        yield ("NQ", "Normal Quality", "Select normal quality model")
+        PSO2_OT_ModelSearch._selection_key = key
+        PSO2_OT_ModelSearch._selection = selection
 
+    return PSO2_OT_ModelSearch._selection
 
-def _get_color_sets(item: ListItem, context: bpy.types.Context):
-    with closing(objects.ObjectDatabase(context)) as db:
-        return db.get_color_sets(item.object_type, item.adjusted_id)
+
+def _get_selected_object(self: PSO2_OT_ModelSearch) -> objects.CmxObjectBase | None:
+    if selection := _get_selection(self, None):
+        return selection.obj
+
+    return None
+
+
+def _clear_selection():
+    PSO2_OT_ModelSearch._selection_key = None
+    PSO2_OT_ModelSearch._selection = None
+
+
+# Color sets of every object, loaded all at once the first time any are needed.
+# This is cleared whenever the model list is reloaded from an updated database.
+_color_set_map: dict[tuple[objects.ObjectType, int], objects.CmxColorSets] | None = None
+
+
+def _get_color_sets(
+    object_type: objects.ObjectType, adjusted_id: int, context: bpy.types.Context
+):
+    global _color_set_map
+
+    if _color_set_map is None:
+        with closing(objects.ObjectDatabase(context)) as db:
+            _color_set_map = db.get_all_color_sets()
+
+    if (table_type := objects.get_color_set_type(object_type)) is None:
+        return objects.CmxColorSets(adjusted_id, [])
+
+    return _color_set_map.get(
+        (table_type, adjusted_id), objects.CmxColorSets(adjusted_id, [])
+    )
+
+
+def _clear_color_sets():
+    global _color_set_map
+    _color_set_map = None
 
 
 def _color_set_enum_tuple(index: int, name: str) -> tuple[str, str, str, int]:
@@ -587,7 +537,9 @@ def _color_set_enum_tuple(index: int, name: str) -> tuple[str, str, str, int]:
 
 
 def _get_color_sets_enum(item: ListItem, context: bpy.types.Context):
-    color_sets = _get_color_sets(item, context)
+    color_sets = _get_color_sets(
+        objects.ObjectType(item.object_type), item.adjusted_id, context
+    )
 
     items = [_color_set_enum_tuple(i, s.name) for i, s in enumerate(color_sets.sets)]
     items.append(_color_set_enum_tuple(len(items), "Custom colors"))
@@ -596,7 +548,9 @@ def _get_color_sets_enum(item: ListItem, context: bpy.types.Context):
 
 
 def _get_selected_color_set(item: ListItem, index: int, context: bpy.types.Context):
-    color_sets = _get_color_sets(item, context)
+    color_sets = _get_color_sets(
+        objects.ObjectType(item.object_type), item.adjusted_id, context
+    )
 
     try:
         return color_sets.sets[index]
@@ -605,53 +559,243 @@ def _get_selected_color_set(item: ListItem, index: int, context: bpy.types.Conte
 
 
 def _object_has_color_sets(obj: objects.CmxObjectBase, context: bpy.types.Context):
-    with closing(objects.ObjectDatabase(context)) as db:
-        result = db.get_color_sets(obj.object_type, obj.adjusted_id)
-        return bool(result.sets)
+    return bool(_get_color_sets(obj.object_type, obj.adjusted_id, context).sets)
+
+
+def _update_model_list(context: bpy.types.Context, force=False):
+    """
+    Fill the model list from the database if it is out of date.
+    Returns whether the list was reloaded.
+    """
+    generation = objects.ObjectDatabase.get_generation()
+    model_list = _get_model_list(context)
+
+    if (
+        not force
+        and generation == _model_list_generation
+        and _model_list_index is not None
+        and len(_model_list_index) == len(model_list)
+    ):
+        return False
+
+    _populate_model_list(model_list, context, generation)
+    _clear_color_sets()
+    previews.reset_preview_keys()
+    return True
+
 
+def _populate_model_list(collection, context: bpy.types.Context, generation: int):
+    global _model_list_index, _model_list_generation
 
-def _populate_model_list(collection, context: bpy.types.Context):
     start = time.monotonic()
 
-    collection.clear()
+    with trace_span("populate model list"):
+        with closing(objects.ObjectDatabase(context)) as db:
+            entries = db.get_list_entries()
 
-    with closing(objects.ObjectDatabase(context)) as db:
-        for obj in db.get_all():
+        collection.clear()
+
+        for entry in entries:
             item: ListItem = collection.add()
-            item.populate(obj)
+            item.populate(entry)
+
+        _model_list_index = ModelListIndex(
+            object_types=[entry.object_type for entry in entries],
+            object_ids=[entry.id for entry in entries],
+            search_keys_en=[entry.search_key_en for entry in entries],
+            search_keys_jp=[entry.search_key_jp for entry in entries],
+            sort_ranks={
+                "ALPHA": [entry.alpha_rank for entry in entries],
+                "ID": [entry.id_rank for entry in entries],
+                "LEG_LENGTH": [entry.leg_length_rank for entry in entries],
+            },
+        )
+        _model_list_generation = generation
 
     end = time.monotonic()
     debug_print(f"PSO2 items loaded in {end - start:0.1f}s")
 
 
-def _false(item):
-    return False
-
-
 def _is_ngs(item: ListItem):
-    if item.object_type in _VERSIONLESS_OBJECT_TYPES:
+    if item.object_type in objects.VERSIONLESS_OBJECT_TYPES:
         return False
 
     return objects.is_ngs(item.object_id)
 
 
-def _is_classic(item: ListItem):
-    if item.object_type in _VERSIONLESS_OBJECT_TYPES:
-        return False
+_OBJECT_TYPE_CODES = {
+    object_type: code for code, object_type in enumerate(objects.ObjectType)
+}
+
+
+def _in_ranges(ids: np.ndarray, ranges: Iterable[tuple[int, int]]) -> np.ndarray:
+    result = np.zeros(len(ids), dtype=bool)
+    for start, end in ranges:
+        result |= (ids >= start) & (ids < end)
+
+    return result
+
+
+class ModelListIndex:
+    """
+    Arrays of the filter and sort keys of every item in the model list, so
+    PSO2_UL_ModelList can filter and sort with vectorized operations. The last
+    result is memoized, since the list gets filtered on every redraw.
+    """
+
+    def __init__(
+        self,
+        object_types: Sequence[objects.ObjectType],
+        object_ids: Sequence[int],
+        search_keys_en: Sequence[str],
+        search_keys_jp: Sequence[str],
+        sort_ranks: dict[str, Sequence[int]],
+    ):
+        self.type_codes = np.array(
+            [_OBJECT_TYPE_CODES[t] for t in object_types], dtype=np.int32
+        )
+        self.object_ids = np.array(object_ids, dtype=np.int64)
+        self.search_keys_en = np.array(search_keys_en, dtype=np.str_)
+        self.search_keys_jp = np.array(search_keys_jp, dtype=np.str_)
+
+        # Position of each item for each sort mode, precomputed by the database
+        self.sort_ranks = {
+            sort: np.array(ranks, dtype=np.int64) for sort, ranks in sort_ranks.items()
+        }
+
+        self.is_ngs = self.object_ids >= objects.NGS_START
+        self.is_versionless = np.isin(
+            self.type_codes, _get_type_codes(objects.VERSIONLESS_OBJECT_TYPES)
+        )
+        self.is_gendered = np.isin(
+            self.type_codes, _get_type_codes(objects.GENDERED_OBJECT_TYPES)
+        )
+        self.is_t1 = _in_ranges(self.object_ids, objects.T1_RANGES)
+        self.is_t2 = _in_ranges(self.object_ids, objects.T2_RANGES)
+
+        self._memo_key: tuple | None = None
+        self._memo_result: tuple[list[int], list[int]] = ([], [])
 
-    return not objects.is_ngs(item.object_id)
+    @classmethod
+    def from_items(cls, items: Sequence[ListItem]):
+        return cls(
+            object_types=[objects.ObjectType(item.object_type) for item in items],
+            object_ids=[item.object_id for item in items],
+            search_keys_en=[item.search_key_en for item in items],
+            search_keys_jp=[item.search_key_jp for item in items],
+            sort_ranks={
+                "ALPHA": [item.alpha_rank for item in items],
+                "ID": [item.id_rank for item in items],
+                "LEG_LENGTH": [item.leg_length_rank for item in items],
+            },
+        )
+
+    def __len__(self):
+        return len(self.object_ids)
 
+    def filter(
+        self,
+        bitflag: int,
+        filter_name: str,
+        versions: set[str],
+        body_types: set[str],
+        categories: set[str],
+        sort: str,
+    ) -> tuple[list[int], list[int]]:
+        """Get (flags, new order) for UIList.filter_items()"""
+        key = (
+            bitflag,
+            filter_name,
+            frozenset(versions),
+            frozenset(body_types),
+            frozenset(categories),
+            sort,
+        )
+        if key == self._memo_key:
+            return self._memo_result
 
-def _is_t1(item: ListItem):
-    return objects.is_t1(item.object_id)
+        show = self._filter_name(filter_name)
 
+        if versions:
+            if "NGS" not in versions:
+                show &= ~self.is_ngs | self.is_versionless
+            if "CLASSIC" not in versions:
+                show &= self.is_ngs | self.is_versionless
 
-def _is_t2(item: ListItem):
-    return objects.is_t2(item.object_id)
+        if body_types:
+            hide = np.zeros(len(self), dtype=bool)
+            if "T1" not in body_types:
+                hide |= self.is_t1
+            if "T2" not in body_types:
+                hide |= self.is_t2
+            if "NONE" not in body_types:
+                hide |= ~self.is_t1 & ~self.is_t2
 
+            show &= ~(hide & self.is_gendered)
 
-def _is_genderless(item: ListItem):
-    return objects.is_genderless(item.object_id)
+        if categories:
+            show_types = [x.strip() for enum in categories for x in enum.split("|")]
+            show &= np.isin(self.type_codes, _get_type_codes(show_types))
+
+        ranks = self.sort_ranks.get(sort, self.sort_ranks["ID"])
+        flags = np.where(show, bitflag, 0)
+
+        self._memo_key = key
+        self._memo_result = (flags.tolist(), ranks.tolist())
+
+        return self._memo_result
+
+    def _filter_name(self, filter_name: str) -> np.ndarray:
+        if not filter_name:
+            return np.ones(len(self), dtype=bool)
+
+        # Same wildcard matching as UI_UL_list.filter_items_by_name(), but the
+        # pattern is normalized the same way as the search keys from the database.
+        pattern = collation.search_pattern(filter_name)
+        return _match_pattern(self.search_keys_en, pattern) | _match_pattern(
+            self.search_keys_jp, pattern
+        )
+
+
+def _match_pattern(keys: np.ndarray, pattern: str) -> np.ndarray:
+    """Match each key against the wildcard pattern *<pattern>*"""
+    if "?" in pattern:
+        # Rarely used, so not worth vectorizing
+        regex = re.compile(fnmatch.translate(f"*{pattern}*"))
+        return np.fromiter(
+            (regex.match(key) is not None for key in keys.tolist()),
+            dtype=bool,
+            count=len(keys),
+        )
+
+    # Each part between * wildcards must be found after the previous one.
+    found = np.ones(len(keys), dtype=bool)
+    start = np.zeros(len(keys), dtype=np.int64)
+
+    for part in pattern.split("*"):
+        if part:
+            index = np.char.find(keys, part, start)
+            found &= index >= 0
+            start = index + len(part)
+
+    return found
+
+
+def _get_type_codes(object_types: Iterable[str]):
+    return [_OBJECT_TYPE_CODES[t] for t in object_types if t in _OBJECT_TYPE_CODES]
+
+
+_model_list_index: ModelListIndex | None = None
+_model_list_generation: int | None = None
+
+
+def _get_model_list_index(items: Sequence[ListItem]):
+    global _model_list_index
+
+    if _model_list_index is None or len(_model_list_index) != len(items):
+        _model_list_index = ModelListIndex.from_items(items)
+
+    return _model_list_index
 
 
 @classes.register
@@ -672,93 +816,14 @@ class PSO2_UL_ModelList(bpy.types.UIList):
         preferences = get_preferences(context)
         items: Sequence[ListItem] = getattr(data, property)
 
-        if self.filter_name:
-            # https://github.com/nutti/fake-bpy-module/issues/376
-            flt_flags = cast(
-                "list[int]",
-                bpy.types.UI_UL_list.filter_items_by_name(
-                    self.filter_name,
-                    self.bitflag_filter_item,
-                    items,
-                    propname="item_name",
-                ),
-            )
-        else:
-            flt_flags = [self.bitflag_filter_item] * len(items)
-
-        def hide_item(idx):
-            flt_flags[idx] &= ~self.bitflag_filter_item
-
-        if preferences.model_search_versions:
-            should_hide_ngs = (
-                _is_ngs if "NGS" not in preferences.model_search_versions else _false
-            )
-            should_hide_classic = (
-                _is_classic
-                if "CLASSIC" not in preferences.model_search_versions
-                else _false
-            )
-
-            for idx, item in enumerate(items):
-                if should_hide_ngs(item) or should_hide_classic(item):
-                    hide_item(idx)
-
-        if preferences.model_search_body_types:
-            should_hide_t1 = (
-                _is_t1 if "T1" not in preferences.model_search_body_types else _false
-            )
-            should_hide_t2 = (
-                _is_t2 if "T2" not in preferences.model_search_body_types else _false
-            )
-            should_hide_genderless = (
-                _is_genderless
-                if "NONE" not in preferences.model_search_body_types
-                else _false
-            )
-
-            for idx, item in enumerate(items):
-                if item.object_type not in _GENDERED_OBJECT_TYPES:
-                    continue
-
-                if (
-                    should_hide_t1(item)
-                    or should_hide_t2(item)
-                    or should_hide_genderless(item)
-                ):
-                    hide_item(idx)
-
-        if preferences.model_search_categories:
-            show_types = {
-                x.strip()
-                for enum in preferences.model_search_categories
-                for x in enum.split("|")
-            }
-            for idx, item in enumerate(items):
-                if str(item.object_type) not in show_types:
-                    hide_item(idx)
-
-        match preferences.model_search_sort:
-            case "ALPHA":
-                flt_neworder = bpy.types.UI_UL_list.sort_items_by_name(
-                    items, "sort_name"
-                )
-
-            case "LEG_LENGTH":
-                _sort = [
-                    (idx, (item.leg_length, item.sort_name))
-                    for idx, item in enumerate(items)
-                ]
-                flt_neworder = bpy.types.UI_UL_list.sort_items_helper(
-                    _sort, lambda e: e[1]
-                )
-
-            case _:
-                _sort = [(idx, item.object_id) for idx, item in enumerate(items)]
-                flt_neworder = bpy.types.UI_UL_list.sort_items_helper(
-                    _sort, lambda e: e[1]
-                )
-
-        return flt_flags, flt_neworder
+        return _get_model_list_index(items).filter(
+            self.bitflag_filter_item,
+            self.filter_name,
+            versions=preferences.model_search_versions,
+            body_types=preferences.model_search_body_types,
+            categories=preferences.model_search_categories,
+            sort=preferences.model_search_sort,
+        )
 
     def draw_filter(self, context, layout):
         if layout is None:
@@ -806,11 +871,14 @@ class PSO2_UL_ModelList(bpy.types.UIList):
         if self.layout_type in {"DEFAULT", "COMPACT"}:
             preferences = get_preferences(context)
 
-            icon = _get_icon(objects.ObjectType(item.object_type))
-
             row = layout.split(factor=0.5)
 
-            row.label(text=item.item_name, icon=icon)
+            # Previews are only requested for the rows that are drawn.
+            if icon_value := _get_preview_icon(context, item):
+                row.label(text=item.item_name, icon_value=icon_value)
+            else:
+                icon = _get_icon(objects.ObjectType(item.object_type))
+                row.label(text=item.item_name, icon=icon)
             row.label(text=item.description)
 
             match preferences.model_search_sort:
@@ -824,6 +892,15 @@ class PSO2_UL_ModelList(bpy.types.UIList):
             pass
 
 
+def _get_preview_icon(context: bpy.types.Context, item: ListItem):
+    if not get_preferences(context).model_search_previews:
+        return 0
+
+    return previews.get_preview_manager().get_icon_id(
+        context, item.object_type, item.object_id
+    )
+
+
 def _get_icon(object_type: objects.ObjectType) -> BlenderIcon:
     match object_type:
         case objects.ObjectType.ACCESSORY:
@@ -1,7 +1,7 @@
 import hashlib
 import sqlite3
 from collections import defaultdict
-from collections.abc import Callable, Generator, Iterable
+from collections.abc import Callable, Collection, Generator, Iterable
 from contextlib import closing, suppress
 from dataclasses import dataclass, field, fields
 from enum import StrEnum
@@ -11,9 +11,9 @@ from typing import TYPE_CHECKING, Any, TypeVar
 
 import bpy
 
-from . import ccl, classes, datafile, ice, preferences
+from . import ccl, classes, collation, datafile, ice, preferences
 from .colors import ColorId, ColorMapping
-from .debug import debug_print
+from .debug import debug_print, trace_span, trace_operator
 from .paths import get_data_path
 from .util import OperatorResult, dict_get
 
@@ -118,30 +118,58 @@ def is_ngs(object_id: int):
     return object_id >= NGS_START
 
 
+T1_RANGES = [
+    (CLASSIC_MALE_COSTUME_START, CLASSIC_FEMALE_COSTUME_START),
+    (CLASSIC_MALE_START, CLASSIC_FEMALE_START),
+    (CLASSIC_CAST_START, CLASSIC_CASEAL_START),
+    (NGS_T1_START, NGS_T2_START),
+    (NGS_CAST_START, NGS_CASEAL_START),
+]
+"[start, end) ranges of T1 object IDs"
+
+T2_RANGES = [
+    (CLASSIC_FEMALE_COSTUME_START, CLASSIC_MALE_START),
+    (CLASSIC_FEMALE_START, CLASSIC_CAST_START),
+    (CLASSIC_CASEAL_START, CLASSIC_UNKNOWN_START),
+    (NGS_T2_START, NGS_CAST_START),
+    (NGS_CASEAL_START, NGS_GENDERLESS_START),
+]
+"[start, end) ranges of T2 object IDs"
+
+
 def is_t1(object_id: int):
-    return (
-        CLASSIC_MALE_COSTUME_START <= object_id < CLASSIC_FEMALE_COSTUME_START
-        or CLASSIC_MALE_START <= object_id < CLASSIC_FEMALE_START
-        or CLASSIC_CAST_START <= object_id < CLASSIC_CASEAL_START
-        or NGS_T1_START <= object_id < NGS_T2_START
-        or NGS_CAST_START <= object_id < NGS_CASEAL_START
-    )
+    return any(start <= object_id < end for start, end in T1_RANGES)
 
 
 def is_t2(object_id: int):
-    return (
-        CLASSIC_FEMALE_COSTUME_START <= object_id < CLASSIC_MALE_START
-        or CLASSIC_FEMALE_START <= object_id < CLASSIC_CAST_START
-        or CLASSIC_CASEAL_START <= object_id < CLASSIC_UNKNOWN_START
-        or NGS_T2_START <= object_id < NGS_CAST_START
-        or NGS_CASEAL_START <= object_id < NGS_GENDERLESS_START
-    )
+    return any(start <= object_id < end for start, end in T2_RANGES)
 
 
 def is_genderless(object_id: int):
     return not is_t1(object_id) and not is_t2(object_id)
 
 
+GENDERED_OBJECT_TYPES = [
+    ObjectType.BASEWEAR,
+    ObjectType.BODYPAINT,
+    ObjectType.CAST_ARMS,
+    ObjectType.CAST_BODY,
+    ObjectType.CAST_LEGS,
+    ObjectType.COSTUME,
+    ObjectType.FACE,
+    ObjectType.FACE_TEXTURE,
+    ObjectType.INNERWEAR,
+    ObjectType.OUTERWEAR,
+    ObjectType.SKIN,
+]
+"Object types which have separate T1 and T2 IDs"
+
+VERSIONLESS_OBJECT_TYPES = [
+    ObjectType.STICKER,
+]
+"Object types which are shared by classic and NGS"
+
+
 def md5digest(text: str):
     """Get an MD5 hex digest of a string"""
     return hashlib.md5(text.encode()).hexdigest()
@@ -326,6 +354,14 @@ def _color_set_table(object_type: ObjectType):
     return f"colors_{object_type}"
 
 
+def get_color_set_type(object_type: ObjectType) -> ObjectType | None:
+    """Get the type whose color set table holds color sets for an object type"""
+    if object_type == ObjectType.CAST_BODY:
+        object_type = ObjectType.COSTUME
+
+    return object_type if object_type in _COLOR_SET_TYPES else None
+
+
 @dataclass
 class CmxColorSet:
     id: int
@@ -338,6 +374,16 @@ class CmxColorSet:
     def name(self):
         return self.name_en or self.name_jp or ""
 
+    @classmethod
+    def from_db_row(cls, row: sqlite3.Row):
+        return cls(
+            id=row["id"],
+            name_jp=row["name_jp"],
+            name_en=row["name_en"],
+            color1=row["color1"],
+            color2=row["color2"],
+        )
+
     @staticmethod
     def get_channels(object_type: ObjectType) -> tuple[ColorId, ColorId] | None:
         match object_type:
@@ -393,19 +439,24 @@ class CmxColorSets:
         )
 
         return CmxColorSets(
-            base_id=base_id,
-            sets=[
-                CmxColorSet(
-                    id=row["id"],
-                    name_jp=row["name_jp"],
-                    name_en=row["name_en"],
-                    color1=row["color1"],
-                    color2=row["color2"],
-                )
-                for row in q
-            ],
+            base_id=base_id, sets=[CmxColorSet.from_db_row(row) for row in q]
         )
 
+    @classmethod
+    def db_select_all(cls, con: sqlite3.Connection, object_type: ObjectType):
+        """Get the color sets for every object of a type, keyed by base ID"""
+        q = con.execute(f"SELECT * FROM colors_{object_type} ORDER BY base_id, id")
+
+        result: dict[int, CmxColorSets] = {}
+        for row in q:
+            base_id = row["base_id"]
+            if base_id not in result:
+                result[base_id] = CmxColorSets(base_id=base_id, sets=[])
+
+            result[base_id].sets.append(CmxColorSet.from_db_row(row))
+
+        return result
+
 
 @dataclass
 class CmxObjectBase:
@@ -648,8 +699,120 @@ class CmxHornObject(CmxObjectWithFile):
     pass
 
 
+@dataclass
+class CmxListEntry:
+    """The fields of an object needed to list it without loading the full object"""
+
+    object_type: ObjectType
+    id: int
+    adjusted_id: int
+    name_en: str = ""
+    name_jp: str = ""
+    leg_length: float | None = None
+
+    # Position of the object in the list of all objects for each sort mode
+    alpha_rank: int = 0
+    id_rank: int = 0
+    leg_length_rank: int = 0
+
+    # Names normalized by collation.search_key(). See get_search_keys().
+    search_key_en: str = ""
+    search_key_jp: str = ""
+
+    @property
+    def name(self):
+        return self.name_en or self.name_jp or f"Unnamed {self.id}"
+
+    @property
+    def has_name(self):
+        return bool(self.name_en or self.name_jp)
+
+
+_SEARCH_INDEX_SCHEMA = """
+CREATE TABLE search_index(
+    object_type TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    alpha_rank INTEGER NOT NULL,
+    id_rank INTEGER NOT NULL,
+    leg_length_rank INTEGER NOT NULL,
+    search_key_en TEXT NOT NULL,
+    search_key_jp TEXT NOT NULL,
+    PRIMARY KEY (object_type, id)
+);
+CREATE INDEX search_index_alpha ON search_index(alpha_rank);
+CREATE INDEX search_index_id ON search_index(id_rank);
+CREATE INDEX search_index_leg_length ON search_index(leg_length_rank);
+"""
+
+_SORT_COLUMNS = {
+    "ALPHA": "alpha_rank",
+    "ID": "id_rank",
+    "LEG_LENGTH": "leg_length_rank",
+}
+
+
+def get_search_keys(entry: CmxListEntry):
+    """
+    Get the English and Japanese names to search for an object. Unnamed objects
+    are searched by the "Unnamed <id>" name the model list shows for them.
+    """
+    if not entry.has_name:
+        return collation.search_key(entry.name), ""
+
+    return collation.search_key(entry.name_en), collation.search_key(entry.name_jp)
+
+
+@dataclass
+class ObjectQuery:
+    """
+    Filters for ObjectDatabase.query(). Filters which are None or empty match
+    every object.
+    """
+
+    object_types: Collection[ObjectType] | None = None
+    ids: Collection[int] | None = None
+    versions: Collection[str] | None = None
+    "Any of NGS, CLASSIC"
+    body_types: Collection[str] | None = None
+    "Any of T1, T2, NONE. Only applies to GENDERED_OBJECT_TYPES"
+    name: str = ""
+    "Wildcard pattern to match against English or Japanese names"
+    sort: str = "ID"
+    "One of ALPHA, ID, LEG_LENGTH"
+    limit: int = 200
+
+
+@dataclass
+class ObjectPage:
+    objects: list["CmxObjectBase"]
+    cursor: int | None
+    "Pass to ObjectDatabase.query() to get the next page, or None if this is the last"
+
+
+def _id_ranges_sql(ranges: Iterable[tuple[int, int]]):
+    return (
+        "("
+        + " OR ".join(f"(s.id>={start} AND s.id<{end})" for start, end in ranges)
+        + ")"
+    )
+
+
+def _object_types_sql(object_types: Iterable[ObjectType]):
+    return "s.object_type IN (" + ",".join(f"'{t}'" for t in object_types) + ")"
+
+
+def _get_ranks(items: list[Any], key: Callable[[Any], Any]) -> list[int]:
+    """Get the position of each item in the list after sorting it by key"""
+    order = sorted(range(len(items)), key=lambda i: key(items[i]))
+    ranks = [0] * len(items)
+    for rank, index in enumerate(order):
+        ranks[index] = rank
+
+    return ranks
+
+
 class ObjectDatabase:
-    VERSION = 7
+    VERSION = 11
 
     def __init__(self, context: bpy.types.Context):
         self.context = context
@@ -658,6 +821,136 @@ class ObjectDatabase:
     def close(self):
         self.con.close()
 
+    @staticmethod
+    def get_path():
+        return get_data_path() / "objects.db"
+
+    @staticmethod
+    def get_generation() -> int:
+        """
+        Get a value which changes whenever the database is written, so anything
+        cached from it can tell when it is out of date.
+        """
+        try:
+            return ObjectDatabase.get_path().stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def get_object(self, object_type: ObjectType, item_id: int) -> CmxObjectBase | None:
+        cls = _object_types[object_type]
+        return next(iter(self._get_objects(cls, object_type, item_id)), None)
+
+    def get_list_entries(self) -> list[CmxListEntry]:
+        """Get the list entry for every object, without reading any other fields"""
+        result = []
+
+        for object_type, cls in _object_types.items():
+            has_leg_length = any(f.name == "leg_length" for f in fields(cls))
+            leg_length = "leg_length" if has_leg_length else "NULL"
+
+            with trace_span("ObjectDatabase list", table=str(object_type)):
+                q = self.con.execute(
+                    f"""
+                    SELECT
+                        t.id, t.adjusted_id, t.name_en, t.name_jp, {leg_length},
+                        COALESCE(s.alpha_rank, 0),
+                        COALESCE(s.id_rank, 0),
+                        COALESCE(s.leg_length_rank, 0),
+                        COALESCE(s.search_key_en, ''),
+                        COALESCE(s.search_key_jp, '')
+                    FROM {object_type} t
+                    LEFT JOIN search_index s ON s.object_type=? AND s.id=t.id
+                    """,
+                    (str(object_type),),
+                )
+                result.extend(CmxListEntry(object_type, *row) for row in q)
+
+        return result
+
+    def query(self, query: ObjectQuery, cursor: int | None = None) -> ObjectPage:
+        """
+        Get one page of objects matching a query, in sorted order. Pass the
+        returned cursor back in to get the next page.
+        """
+        sort_column = _SORT_COLUMNS[query.sort]
+        where = [f"s.{sort_column}>?"]
+        params: list[Any] = [-1 if cursor is None else cursor]
+
+        if query.object_types:
+            where.append(_object_types_sql(ObjectType(t) for t in query.object_types))
+
+        if query.ids:
+            where.append(f"s.id IN ({','.join('?' * len(query.ids))})")
+            params.extend(query.ids)
+
+        if query.versions:
+            versionless = _object_types_sql(VERSIONLESS_OBJECT_TYPES)
+            if "NGS" not in query.versions:
+                where.append(f"(s.id<{NGS_START} OR {versionless})")
+            if "CLASSIC" not in query.versions:
+                where.append(f"(s.id>={NGS_START} OR {versionless})")
+
+        if query.body_types:
+            hide = []
+            if "T1" not in query.body_types:
+                hide.append(_id_ranges_sql(T1_RANGES))
+            if "T2" not in query.body_types:
+                hide.append(_id_ranges_sql(T2_RANGES))
+            if "NONE" not in query.body_types:
+                hide.append(
+                    f"NOT {_id_ranges_sql(T1_RANGES)} AND NOT {_id_ranges_sql(T2_RANGES)}"
+                )
+
+            if hide:
+                gendered = _object_types_sql(GENDERED_OBJECT_TYPES)
+                where.append(f"NOT ({gendered} AND (({') OR ('.join(hide)})))")
+
+        if query.name:
+            # Neither name column has an index, since GLOB can't use one for a
+            # pattern which starts with a wildcard.
+            pattern = f"*{collation.search_pattern(query.name)}*"
+            where.append("(s.search_key_en GLOB ? OR s.search_key_jp GLOB ?)")
+            params.extend((pattern, pattern))
+
+        params.append(query.limit)
+
+        with trace_span("ObjectDatabase query page", sort=query.sort):
+            rows = self.con.execute(
+                f"""
+                SELECT s.object_type, s.id, s.{sort_column} FROM search_index s
+                WHERE {" AND ".join(where)}
+                ORDER BY s.{sort_column}
+                LIMIT ?
+                """,
+                params,
+            ).fetchall()
+
+            page = self._get_objects_by_key(
+                [(ObjectType(object_type), item_id) for object_type, item_id, _ in rows]
+            )
+
+        next_cursor = rows[-1][2] if len(rows) == query.limit else None
+        return ObjectPage(page, next_cursor)
+
+    def _get_objects_by_key(self, keys: list[tuple[ObjectType, int]]):
+        """Get objects by (type, ID), in the same order as the keys"""
+        ids_by_type: defaultdict[ObjectType, list[int]] = defaultdict(list)
+        for object_type, item_id in keys:
+            ids_by_type[object_type].append(item_id)
+
+        found: dict[tuple[ObjectType, int], CmxObjectBase] = {}
+        for object_type, ids in ids_by_type.items():
+            q = self.con.execute(
+                f"SELECT * FROM {object_type} WHERE id IN ({','.join('?' * len(ids))})",
+                ids,
+            )
+            cls = _object_types[object_type]
+            for row in q:
+                obj = cls.from_db_row(object_type, row)
+                found[object_type, obj.id] = obj
+
+        return [found[key] for key in keys if key in found]
+
     def get_all(
         self, item_id: int | None = None, file_hash: str | None = None
     ) -> Generator[CmxObjectBase, None, None]:
@@ -737,6 +1030,22 @@ class ObjectDatabase:
     def get_skins(self, item_id: int | None = None, file_hash: str | None = None):
         return self._get_objects(CmxSkinObject, ObjectType.SKIN, item_id, file_hash)
 
+    def get_sorted_skins(self) -> list[CmxSkinObject]:
+        """
+        Get all skins sorted by name, except the base T1 and T2 body skins are
+        always first.
+        """
+        with trace_span("ObjectDatabase query", table=str(ObjectType.SKIN)):
+            q = self.con.execute(
+                f"""
+                SELECT * FROM {ObjectType.SKIN}
+                ORDER BY
+                    id NOT IN ({NGS_T1_START}, {NGS_T2_START}),
+                    CASE WHEN name_en != '' THEN name_en ELSE name_jp END
+                """
+            )
+            return [CmxSkinObject.from_db_row(ObjectType.SKIN, row) for row in q]
+
     def get_stickers(self, item_id: int | None = None, file_hash: str | None = None):
         return self._get_objects(CmxSticker, ObjectType.STICKER, item_id, file_hash)
 
@@ -749,6 +1058,16 @@ class ObjectDatabase:
         object_type: ObjectType,
         item_id: int | None = None,
         file_hash: str | None = None,
+    ) -> list[T]:
+        with trace_span("ObjectDatabase query", table=str(object_type)):
+            return self._query_objects(cls, object_type, item_id, file_hash)
+
+    def _query_objects(
+        self,
+        cls: type[T],
+        object_type: ObjectType,
+        item_id: int | None = None,
+        file_hash: str | None = None,
     ) -> list[T]:
         if file_hash is not None:
             q = self.con.execute(
@@ -763,13 +1082,26 @@ class ObjectDatabase:
         return [cls.from_db_row(object_type, row) for row in q]
 
     def get_color_sets(self, object_type: ObjectType, item_id: int) -> CmxColorSets:
-        if object_type == ObjectType.CAST_BODY:
-            object_type = ObjectType.COSTUME
-
-        if object_type not in _COLOR_SET_TYPES:
+        if (table_type := get_color_set_type(object_type)) is None:
             return CmxColorSets(item_id, [])
 
-        return CmxColorSets.db_select(self.con, object_type, item_id)
+        return CmxColorSets.db_select(self.con, table_type, item_id)
+
+    def get_all_color_sets(self) -> dict[tuple[ObjectType, int], CmxColorSets]:
+        """
+        Get the color sets for every object in one pass, keyed by
+        (get_color_set_type(object type), adjusted ID).
+        """
+        result = {}
+
+        with trace_span("ObjectDatabase color sets"):
+            for object_type in _COLOR_SET_TYPES:
+                for base_id, color_sets in CmxColorSets.db_select_all(
+                    self.con, object_type
+                ).items():
+                    result[object_type, base_id] = color_sets
+
+        return result
 
     def update_database(self):
         from AquaModelLibrary.Data.PSO2.Aqua import CharacterMakingIndex, PSO2Text
@@ -777,17 +1109,19 @@ class ObjectDatabase:
 
         bin_path = preferences.get_preferences(self.context).get_pso2_bin_path()
 
-        cmx: CharacterMakingIndex = ReferenceGenerator.ExtractCMX(str(bin_path))
+        with trace_span("ExtractCMX"):
+            cmx: CharacterMakingIndex = ReferenceGenerator.ExtractCMX(str(bin_path))
 
-        parts_text, accessory_text, _common_text, _common_text_reboot = (
-            ReferenceGenerator.ReadCMXText(
-                str(bin_path), PSO2Text(), PSO2Text(), PSO2Text(), PSO2Text()
+        with trace_span("ReadCMXText"):
+            parts_text, accessory_text, _common_text, _common_text_reboot = (
+                ReferenceGenerator.ReadCMXText(
+                    str(bin_path), PSO2Text(), PSO2Text(), PSO2Text(), PSO2Text()
+                )
             )
-        )
 
         colors = _get_ccl(bin_path)
 
-        with self.con:
+        with self.con, trace_span("write database"):
             self._reset_db()
 
             self._read_accessories(cmx, accessory_text)
@@ -811,11 +1145,13 @@ class ObjectDatabase:
             self._read_stickers(cmx, parts_text)
             self._read_teeth(cmx, parts_text)
 
+            self._write_search_index()
+
             # TODO: objects that aren't in CMX (enemies, weapons, etc.)
 
     @staticmethod
     def _open_db():
-        path = get_data_path() / "objects.db"
+        path = ObjectDatabase.get_path()
         path.parent.mkdir(parents=True, exist_ok=True)
 
         con = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
@@ -853,6 +1189,7 @@ class ObjectDatabase:
                     for object_type in _COLOR_SET_TYPES
                 )
             )
+            con.executescript(_SEARCH_INDEX_SCHEMA)
             con.execute(f"PRAGMA user_version={ObjectDatabase.VERSION}")
 
         return con
@@ -864,6 +1201,50 @@ class ObjectDatabase:
         for object_type in _COLOR_SET_TYPES:
             self.con.execute(f"DELETE FROM {_color_set_table(object_type)}")
 
+        self.con.execute("DELETE FROM search_index")
+
+    def _write_search_index(self):
+        """
+        Precompute the position of each object in the model list for each sort
+        mode, so the list doesn't need to sort itself, and normalized names to
+        search.
+        """
+        with trace_span("write search index"):
+            entries = self.get_list_entries()
+
+            # Unnamed objects go at the end.
+            alpha_ranks = _get_ranks(
+                entries,
+                lambda e: (
+                    not e.has_name,
+                    collation.sort_key(e.name),
+                    e.name,
+                    e.id,
+                ),
+            )
+            id_ranks = _get_ranks(entries, lambda e: e.id)
+            leg_length_ranks = _get_ranks(
+                list(zip(entries, alpha_ranks, strict=True)),
+                lambda e: (e[0].leg_length or 0, e[1]),
+            )
+
+            self.con.executemany(
+                "INSERT INTO search_index VALUES(?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        str(entry.object_type),
+                        entry.id,
+                        alpha,
+                        id_rank,
+                        leg_length,
+                        *get_search_keys(entry),
+                    )
+                    for entry, alpha, id_rank, leg_length in zip(
+                        entries, alpha_ranks, id_ranks, leg_length_ranks, strict=True
+                    )
+                ),
+            )
+
     def _read_accessories(self, cmx: "CharacterMakingIndex", text: "PSO2Text"):
         names = _get_item_names(text, CmxCategory.ACCESSORY)
         for item_id in cmx.accessoryDict.Keys:
@@ -1540,6 +1921,58 @@ def _get_color_sets(
         yield CmxColorSets(base_id, sets)
 
 
+class SkinCatalogue:
+    """
+    All skins, read once and shared by the skin texture preferences and imports
+    that need the default skin textures.
+    """
+
+    def __init__(self, skins: list[CmxSkinObject]):
+        self.skins = {skin.id: skin for skin in skins}
+
+        # The enums keep references to their strings, which Blender needs to
+        # stay alive for as long as the enum items are in use.
+        self.t1_enum_items = self._get_enum_items(skins, is_t2=False)
+        self.t2_enum_items = self._get_enum_items(skins, is_t2=True)
+
+    def get(self, skin_id: int):
+        return self.skins.get(skin_id)
+
+    @staticmethod
+    def _get_enum_items(skins: list[CmxSkinObject], is_t2: bool):
+        items = [
+            (str(skin.id), skin.name, "")
+            for skin in skins
+            if skin.is_t2 == is_t2 and skin.has_name
+        ]
+
+        if not items:
+            if is_t2:
+                return [(str(NGS_T2_START), "Base Body T2", "")]
+
+            return [(str(NGS_T1_START), "Base Body T1", "")]
+
+        return items
+
+
+_skin_catalogue: SkinCatalogue | None = None
+
+
+def get_skin_catalogue(context: bpy.types.Context):
+    global _skin_catalogue
+
+    if _skin_catalogue is None:
+        with closing(ObjectDatabase(context)) as db:
+            _skin_catalogue = SkinCatalogue(db.get_sorted_skins())
+
+    return _skin_catalogue
+
+
+def clear_skin_catalogue():
+    global _skin_catalogue
+    _skin_catalogue = None
+
+
 @classes.register
 class PSO2_OT_UpdateCharacterDatabase(bpy.types.Operator):
     """Update the database of character models and textures from game data"""
@@ -1548,9 +1981,14 @@ class PSO2_OT_UpdateCharacterDatabase(bpy.types.Operator):
     bl_idname = "pso2.update_character_database"
 
     def execute(self, context) -> OperatorResult:
-        with closing(ObjectDatabase(context)) as db:
+        with (
+            trace_operator(context, "update_database"),
+            closing(ObjectDatabase(context)) as db,
+        ):
             db.update_database()
 
+        clear_skin_catalogue()
+
         # Since I can't find any decent way to be notified when an operator gets run, use
         #
         #   layout.context_pointer_set("parent", self)
@@ -1,3 +1,4 @@
+import tomllib
 from pathlib import Path
 
 import bpy
@@ -5,9 +6,29 @@ import bpy
 ADDON_PATH = Path(__file__).parent
 BIN_PATH = ADDON_PATH / "bin"
 
+_CONVERTER_DLL = BIN_PATH / "AquaModelLibrary.Core.dll"
+
 
 def get_data_path():
     if not __package__:
         raise RuntimeError("__package__ is unset")
 
     return Path(bpy.utils.extension_path_user(__package__, create=True))
+
+
+def get_addon_version():
+    """Get the add-on version from its manifest"""
+    try:
+        with (ADDON_PATH / "blender_manifest.toml").open("rb") as f:
+            return str(tomllib.load(f).get("version", ""))
+    except (OSError, tomllib.TOMLDecodeError):
+        return ""
+
+
+def get_converter_version():
+    """Get a string which changes when the model converter is updated"""
+    try:
+        stat = _CONVERTER_DLL.stat()
+        return f"{stat.st_size};{stat.st_mtime_ns}"
+    except FileNotFoundError:
+        return ""
@@ -1,6 +1,5 @@
 import os
 import re
-from contextlib import closing
 from pathlib import Path
 from typing import cast
 
@@ -67,6 +66,37 @@ class Pso2ToolsPreferences(bpy.types.AddonPreferences):
         default=False,
     )
 
+    trace: bpy.props.BoolProperty(
+        name="Write timing traces",
+        description="Write a Chrome trace file with the time spent in each step of "
+        "every import and export to the add-on's data folder",
+        default=False,
+    )
+
+    fbx_cache_size: bpy.props.IntProperty(
+        name="FBX Cache Size (MB)",
+        description="Maximum disk space used to cache models converted to FBX for "
+        "faster repeated imports. Set to 0 to disable the cache",
+        min=0,
+        default=1024,
+    )
+
+    scratch_path: bpy.props.StringProperty(
+        name="Scratch Folder",
+        description="Folder for temporary files written during import and export. "
+        "If empty, a RAM-backed folder is used if there is one, otherwise the "
+        "system temporary folder",
+        subtype="DIR_PATH",
+        default="",
+    )
+
+    model_search_previews: bpy.props.BoolProperty(
+        name="Show model previews",
+        description="Show preview images in the model search. Missing previews are "
+        "rendered by importing items in background Blender processes",
+        default=False,
+    )
+
     hide_armature: bpy.props.BoolProperty(
         name="Hide armature on import",
         description="Automatically hide the armature for imported models",
@@ -98,26 +128,11 @@ class Pso2ToolsPreferences(bpy.types.AddonPreferences):
         name="Default Muscularity", min=0, max=1, default=0.5
     )
 
-    # Workaround for a bug: Python must keep a reference to any dynamic enum item
-    # strings or Blender will show garbage.
-    _skin_t1_enum_cache: list[tuple[str, str, str]]
-    _skin_t2_enum_cache: list[tuple[str, str, str]]
-
     def _get_skin_t1_enum_items(self, context: bpy.types.Context | None):
-        if self._skin_t1_enum_cache:
-            return self._skin_t1_enum_cache
-
-        items = _get_skin_enum_items(context, is_t2=False)
-        Pso2ToolsPreferences._skin_t1_enum_cache = items
-        return items
+        return _get_skin_catalogue(context).t1_enum_items
 
     def _get_skin_t2_enum_items(self, context: bpy.types.Context | None):
-        if self._skin_t2_enum_cache:
-            return self._skin_t2_enum_cache
-
-        items = _get_skin_enum_items(context, is_t2=True)
-        Pso2ToolsPreferences._skin_t2_enum_cache = items
-        return items
+        return _get_skin_catalogue(context).t2_enum_items
 
     default_skin_t1: bpy.props.EnumProperty(
         name="Default T1 Skin Texture",
@@ -131,12 +146,6 @@ class Pso2ToolsPreferences(bpy.types.AddonPreferences):
         items=_get_skin_t2_enum_items,
     )
 
-    def _handle_database_update(self, context: bpy.types.Context):
-        self._skin_t1_enum_cache = []
-        self._skin_t2_enum_cache = []
-
-    handle_database_update: bpy.props.BoolProperty(update=_handle_database_update)
-
     model_search_sort: bpy.props.EnumProperty(
         name="Sort",
         default="ALPHA",
@@ -216,28 +225,28 @@ class Pso2ToolsPreferences(bpy.types.AddonPreferences):
         default=False,
     )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self._skin_t1_enum_cache = []
-        self._skin_t2_enum_cache = []
-
     def draw(self, context: bpy.types.Context):
         # Don't use a top-level import to prevent a circular dependency
-        from . import objects
+        from . import fbx_cache, objects
 
         layout: bpy.types.UILayout = self.layout
         layout.use_property_split = True
         layout.use_property_decorate = False
 
-        layout.context_pointer_set("parent", self)
-
         layout.operator(objects.PSO2_OT_UpdateCharacterDatabase.bl_idname)
         layout.separator()
 
         layout.prop(self, "pso2_data_path")
         layout.prop(self, "hide_armature")
+        layout.prop(self, "model_search_previews")
         layout.prop(self, "debug")
+        layout.prop(self, "trace")
+
+        row = layout.row()
+        row.prop(self, "fbx_cache_size")
+        row.operator(fbx_cache.PSO2_OT_ClearFbxCache.bl_idname, text="", icon="TRASH")
+
+        layout.prop(self, "scratch_path")
 
         layout.prop(self, "default_muscularity")
         layout.prop(self, "default_skin_t1")
@@ -271,31 +280,10 @@ def get_preferences(context: bpy.types.Context | None) -> Pso2ToolsPreferences:
     )
 
 
-def _get_skin_enum_items(
-    context: bpy.types.Context | None, is_t2=False
-) -> list[tuple[str, str, str]]:
+def _get_skin_catalogue(context: bpy.types.Context | None):
     # Don't use a top-level import to prevent a circular dependency
     from . import objects
 
     assert context is not None
 
-    with closing(objects.ObjectDatabase(context)) as db:
-        skins = [
-            skin for skin in db.get_skins() if skin.is_t2 == is_t2 and skin.has_name
-        ]
-
-    if not skins:
-        if is_t2:
-            return [("200000", "Base Body T2", "")]
-
-        return [("100000", "Base Body T1", "")]
-
-    # Sort by name, but make sure 100000 and 200000 (base body T1/T2) are always first.
-    skins.sort(
-        key=lambda skin: (
-            skin.id != 100000 and skin.id != 200000,
-            skin.name,
-        )
-    )
-
-    return [(str(skin.id), skin.name, "") for skin in skins]
+    return objects.get_skin_catalogue(context)
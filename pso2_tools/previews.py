@@ -0,0 +1,365 @@
+"""
+Preview images of catalogue items for the model search.
+
+Previews are rendered in background Blender processes, which import each item
+the same way as the model search and render it with Workbench. Rendered images
+are stored in the add-on's data folder, named by a hash of the item and the
+archives it was imported from, so a preview is rendered again if the game files
+change.
+
+The model search only asks for previews of the rows it draws. Working out an
+item's cache key needs the object database and the item's archives, so that is
+not done while drawing. Drawn rows are queued, and a timer looks up their keys
+in batches and loads any cached images. Missing previews are then queued and
+rendered a few at a time while the model search is open.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import subprocess
+import traceback
+from collections import OrderedDict
+from contextlib import closing, suppress
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import cast
+
+import bpy
+import bpy.utils.previews
+from mathutils import Vector
+
+from . import bulk_convert, import_model, objects
+from .paths import get_data_path
+from .preferences import get_preferences
+
+CACHE_DIR_NAME = "previews"
+PREVIEW_SIZE = 128
+
+# Increment this to render all previews again when rendering changes.
+_CACHE_VERSION = 1
+
+# Number of items rendered by each worker process
+_BATCH_SIZE = 8
+# Rows that scrolled out of view long ago are dropped from the queue.
+_MAX_QUEUE_LENGTH = 64
+_POLL_INTERVAL = 0.5
+
+_WORKER_EXPR = "import importlib; importlib.import_module({module!r}).worker_main()"
+
+_ItemKey = tuple[str, int, Path]
+
+
+def get_preview_key(obj: objects.CmxObjectBase, data_path: Path) -> str | None:
+    """
+    Get the cache key for an object's preview, or None if the object has no
+    archives to import.
+    """
+    paths = import_model.get_ice_paths(obj, data_path, high_quality=True)
+    if not paths:
+        return None
+
+    digest = hashlib.sha256(f"{_CACHE_VERSION};{obj.object_type};{obj.id};".encode())
+
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        digest.update(f"{path.name};{stat.st_size};{stat.st_mtime_ns};".encode())
+
+    return digest.hexdigest()
+
+
+def get_cache_path(key: str):
+    return get_data_path() / CACHE_DIR_NAME / f"{key}.png"
+
+
+class PreviewManager:
+    def __init__(self):
+        self.collection = bpy.utils.previews.new()
+
+        self._keys: dict[_ItemKey, str | None] = {}
+        self._key_queue: OrderedDict[_ItemKey, None] = OrderedDict()
+        self._queue: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._rendering: list[str] = []
+        self._unavailable: set[str] = set()
+        self._worker: subprocess.Popen | None = None
+
+        # Timers are compared by identity, so keep one bound method.
+        self._timer = self._poll
+
+    def close(self):
+        bpy.utils.previews.remove(self.collection)
+
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
+
+        if self._worker:
+            self._worker.kill()
+            self._worker = None
+
+    def reset_keys(self):
+        """Forget cached keys after the object database changes"""
+        self._keys.clear()
+        self._key_queue.clear()
+        self._unavailable.clear()
+
+    def get_icon_id(
+        self, context: bpy.types.Context, object_type: str, object_id: int
+    ) -> int:
+        """
+        Get the icon ID of an item's preview. If it isn't loaded yet, this
+        queues it to be loaded or rendered and returns 0. This is called while
+        drawing, so it doesn't read any files.
+        """
+        data_path = get_preferences(context).get_pso2_data_path()
+        item_key = (object_type, object_id, data_path)
+
+        if item_key not in self._keys:
+            self._key_queue[item_key] = None
+            self._key_queue.move_to_end(item_key)
+
+            while len(self._key_queue) > _MAX_QUEUE_LENGTH:
+                self._key_queue.popitem(last=False)
+
+            self._start_timer()
+            return 0
+
+        key = self._keys[item_key]
+        if key is None or key in self._unavailable:
+            return 0
+
+        if preview := self.collection.get(key):
+            return preview.icon_id
+
+        if key not in self._queue and key not in self._rendering:
+            self._request(key, object_type, object_id)
+
+        return 0
+
+    def _load_keys(self):
+        """Look up the keys of all queued items, and load any cached previews"""
+        items = list(self._key_queue)
+        self._key_queue.clear()
+
+        with closing(objects.ObjectDatabase(bpy.context)) as db:
+            for item_key in items:
+                object_type, object_id, data_path = item_key
+                obj = db.get_object(objects.ObjectType(object_type), object_id)
+                key = get_preview_key(obj, data_path) if obj else None
+                self._keys[item_key] = key
+
+                if key and key not in self.collection:
+                    self._load_cached(key)
+
+    def _load_cached(self, key: str):
+        path = get_cache_path(key)
+        if path.exists():
+            self.collection.load(key, str(path), "IMAGE")
+            return True
+
+        return False
+
+    def _request(self, key: str, object_type: str, object_id: int):
+        self._queue[key] = (object_type, object_id)
+
+        while len(self._queue) > _MAX_QUEUE_LENGTH:
+            self._queue.popitem(last=False)
+
+        self._start_timer()
+
+    def _start_timer(self):
+        if not bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.register(self._timer, first_interval=0)
+
+    def _poll(self):
+        if self._key_queue:
+            self._load_keys()
+            _redraw_all()
+
+        if self._worker:
+            if self._worker.poll() is None:
+                return _POLL_INTERVAL
+
+            # Items with nothing to render, such as textures, have no image.
+            for key in self._rendering:
+                if not self._load_cached(key):
+                    self._unavailable.add(key)
+
+            self._worker = None
+            self._rendering = []
+            _redraw_all()
+
+        if not self._queue:
+            return None
+
+        # Render the most recently drawn rows first.
+        batch = [
+            self._queue.popitem(last=True)
+            for _ in range(min(_BATCH_SIZE, len(self._queue)))
+        ]
+
+        self._rendering = [key for key, _ in batch]
+        self._worker = _start_worker(
+            [(object_type, object_id, key) for key, (object_type, object_id) in batch]
+        )
+
+        return _POLL_INTERVAL
+
+
+_manager: PreviewManager | None = None
+
+
+def get_preview_manager():
+    global _manager
+
+    if _manager is None:
+        _manager = PreviewManager()
+
+    return _manager
+
+
+def reset_preview_keys():
+    if _manager is not None:
+        _manager.reset_keys()
+
+
+def close_previews():
+    global _manager
+
+    if _manager is not None:
+        _manager.close()
+        _manager = None
+
+
+def worker_main(argv: list[str] | None = None):
+    """Entry point for worker processes started by PreviewManager"""
+    parser = argparse.ArgumentParser(prog="previews worker")
+    parser.add_argument("job", help="Path to the job description")
+    args = parser.parse_args(bulk_convert.get_script_args(argv))
+
+    job_path = Path(args.job)
+    job = json.loads(job_path.read_text(encoding="utf-8"))
+    job_path.unlink(missing_ok=True)
+
+    with closing(objects.ObjectDatabase(bpy.context)) as db:
+        items = [
+            (db.get_object(objects.ObjectType(object_type), object_id), key)
+            for object_type, object_id, key in job["items"]
+        ]
+
+    for obj, key in items:
+        if obj is None:
+            continue
+
+        try:
+            render_preview(obj, get_cache_path(key), job["size"])
+        except Exception:
+            traceback.print_exc()
+
+
+def render_preview(obj: objects.CmxObjectBase, path: Path, size: int):
+    """
+    Import an object into an empty scene and render a front view of it.
+    Returns False if there was nothing to render.
+    """
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+    result = import_model.import_object(
+        cast("bpy.types.Operator", bulk_convert.ConsoleReporter()),
+        bpy.context,
+        obj,
+    )
+    if "FINISHED" not in result:
+        return False
+
+    scene = bpy.context.scene
+    meshes = [o for o in scene.objects if o.type == "MESH" and o.visible_get()]
+    if not meshes:
+        return False
+
+    _add_camera(scene, meshes)
+
+    scene.render.engine = "BLENDER_WORKBENCH"
+    scene.render.resolution_x = size
+    scene.render.resolution_y = size
+    scene.render.resolution_percentage = 100
+    scene.render.film_transparent = True
+    scene.render.use_file_extension = False
+    scene.render.image_settings.file_format = "PNG"
+    scene.render.image_settings.color_mode = "RGBA"
+    scene.display.shading.light = "STUDIO"
+    scene.display.shading.color_type = "TEXTURE"
+
+    # Render to a temporary name first so a partial file is never visible.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tempfile = path.with_suffix(f".{os.getpid()}.tmp")
+    scene.render.filepath = str(tempfile)
+
+    bpy.ops.render.render(write_still=True)
+    tempfile.replace(path)
+
+    return True
+
+
+def _add_camera(scene: bpy.types.Scene, meshes: list[bpy.types.Object]):
+    """Add an orthographic camera looking at the front of the meshes"""
+    corners = [
+        o.matrix_world @ Vector(corner) for o in meshes for corner in o.bound_box
+    ]
+    low = Vector([min(c[i] for c in corners) for i in range(3)])
+    high = Vector([max(c[i] for c in corners) for i in range(3)])
+    center = (low + high) / 2
+    extent = high - low
+
+    camera_data = bpy.data.cameras.new("Preview")
+    camera_data.type = "ORTHO"
+    camera_data.ortho_scale = max(extent.x, extent.z, 0.01) * 1.1
+    camera_data.clip_start = 0.01
+    camera_data.clip_end = extent.length * 2 + 1
+
+    camera = bpy.data.objects.new("Preview", camera_data)
+    camera.location = (center.x, low.y - extent.length, center.z)
+    camera.rotation_euler = (math.pi / 2, 0, 0)
+
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+
+
+def _start_worker(items: list[tuple[str, int, str]]):
+    job_dir = get_data_path() / CACHE_DIR_NAME / ".jobs"
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    with NamedTemporaryFile(
+        "w", encoding="utf-8", dir=job_dir, suffix=".json", delete=False
+    ) as f:
+        json.dump({"size": PREVIEW_SIZE, "items": items}, f)
+
+    cmd = [
+        bpy.app.binary_path,
+        "--background",
+        "--python-expr",
+        _WORKER_EXPR.format(module=__name__),
+        "--",
+        f.name,
+    ]
+
+    # Workers print everything they import. Only show it when debugging.
+    output = None if get_preferences(bpy.context).debug else subprocess.DEVNULL
+
+    return subprocess.Popen(cmd, stdout=output, stderr=output)
+
+
+def _redraw_all():
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+
+    for window in window_manager.windows:
+        with suppress(AttributeError):
+            for area in window.screen.areas:
+                area.tag_redraw()
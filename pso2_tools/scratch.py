@@ -0,0 +1,170 @@
+"""
+Scratch space for temporary files written during import and export.
+
+Imports and exports write intermediate FBX files and textures that are read
+back once and then deleted. Instead of the system temporary folder, which may be
+slow (e.g. on a network drive), they are written to a RAM-backed folder such as
+/dev/shm when one is available, or to the scratch folder set in the add-on
+preferences, such as a RAM disk. Each session uses one folder there, which is
+deleted when the add-on is unregistered. Its name includes the process ID, so
+folders left behind by a Blender process that crashed are deleted the next time
+a scratch space in the same place is used.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+import bpy
+
+from .debug import debug_print
+from .preferences import get_preferences
+
+_RAM_BACKED_PATHS = [Path("/dev/shm")]
+
+_SESSION_PREFIX = "pso2_tools-"
+
+
+class ScratchSpace:
+    def __init__(self, root: Path):
+        self.root = root
+
+        self.bytes_written: defaultdict[str, int] = defaultdict(int)
+        """Total size of the files written by each kind of operation"""
+
+        self._lock = threading.Lock()
+        self._path: Path | None = None
+
+    @property
+    def path(self):
+        """This session's folder, which is created on first use"""
+        with self._lock:
+            if self._path is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                _delete_stale_sessions(self.root)
+                self._path = Path(
+                    tempfile.mkdtemp(
+                        prefix=f"{_SESSION_PREFIX}{os.getpid()}-", dir=self.root
+                    )
+                )
+
+            return self._path
+
+    @contextmanager
+    def directory(self, name: str) -> Iterator[Path]:
+        """
+        Context manager which creates an empty folder for one operation and
+        deletes it on exit. The size of the files left in it is added to
+        bytes_written[name].
+        """
+        path = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=self.path))
+        try:
+            yield path
+        finally:
+            size = _get_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+
+            with self._lock:
+                self.bytes_written[name] += size
+
+            debug_print(f"Scratch space: {name} wrote {size:,} bytes to {path}")
+
+    def close(self):
+        """Delete this session's folder"""
+        with self._lock:
+            if self._path is not None:
+                shutil.rmtree(self._path, ignore_errors=True)
+                self._path = None
+
+
+def get_default_root():
+    """Get a RAM-backed folder if one is available, else the system temp folder"""
+    for path in _RAM_BACKED_PATHS:
+        if path.is_dir() and os.access(path, os.W_OK):
+            return path
+
+    return Path(tempfile.gettempdir())
+
+
+_spaces: dict[Path, ScratchSpace] = {}
+
+
+def get_scratch_space(context: bpy.types.Context | None):
+    """Get the scratch space for the folder set in the preferences"""
+    root = get_preferences(context).scratch_path
+    root = Path(bpy.path.abspath(root)) if root else get_default_root()
+
+    # Changing the preference must not delete files an operation is still
+    # using, so keep any earlier scratch spaces until unregistering.
+    if root not in _spaces:
+        _spaces[root] = ScratchSpace(root)
+
+    return _spaces[root]
+
+
+def close_scratch_spaces():
+    for space in _spaces.values():
+        space.close()
+
+    _spaces.clear()
+
+
+def _delete_stale_sessions(root: Path):
+    """Delete session folders whose process is no longer running"""
+    for path in root.glob(f"{_SESSION_PREFIX}*"):
+        try:
+            pid = int(path.name.removeprefix(_SESSION_PREFIX).split("-")[0])
+        except ValueError:
+            continue
+
+        if pid != os.getpid() and path.is_dir() and not _is_process_running(pid):
+            debug_print(f"Scratch space: deleting stale folder {path}")
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _is_process_running(pid: int):
+    if sys.platform == "win32":
+        # os.kill() would terminate the process on Windows.
+        import ctypes
+
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        ERROR_ACCESS_DENIED = 5
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def _get_size(path: Path):
+    size = 0
+    for file in path.rglob("*"):
+        with suppress(OSError):
+            if file.is_file():
+                size += file.stat().st_size
+
+    return size
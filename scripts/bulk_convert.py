@@ -0,0 +1,33 @@
+"""
+Convert PSO2 catalogue items to .blend files in bulk.
+
+This must be run by Blender with the PSO2 Tools add-on installed and enabled:
+
+    blender -b --python scripts/bulk_convert.py -- --output out --type basewear -j 4
+
+Run with "-- --help" for all options.
+"""
+
+import importlib
+import sys
+
+import bpy
+
+
+def find_addon_module() -> str:
+    assert bpy.context.preferences is not None
+
+    for name in bpy.context.preferences.addons.keys():  # noqa: SIM118
+        if name.rpartition(".")[2] == "pso2_tools":
+            return name
+
+    raise RuntimeError("The PSO2 Tools add-on is not enabled")
+
+
+def main():
+    module = importlib.import_module(f"{find_addon_module()}.bulk_convert")
+    sys.exit(module.main())
+
+
+if __name__ == "__main__":
+    main()